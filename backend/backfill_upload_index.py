@@ -0,0 +1,44 @@
+import hashlib
+import sys
+from os import getenv, path, walk
+from web.apis.models.file_uploads import UploadedContent
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def backfill_upload_index(*directories):
+    """
+    Index every file already stored under `directories` by its sha256, so the uploader can
+    deduplicate against them. Files stay where they are; when several files share the same
+    content the first one found is kept in the index.
+    """
+    indexed, duplicates = 0, 0
+    for directory in directories:
+        for root, dirs, files in walk(directory):
+            # Skip uploads still being streamed in
+            dirs[:] = [d for d in dirs if d != '.incoming']
+            for name in files:
+                if name.endswith('.part'):
+                    continue
+
+                file_path = path.join(root, name)
+                sha256 = file_sha256(file_path)
+                if UploadedContent.lookup(sha256):
+                    duplicates += 1
+                    continue
+
+                UploadedContent.remember(sha256, file_path, path.getsize(file_path))
+                indexed += 1
+
+    print(f"Indexed {indexed} files, skipped {duplicates} duplicates.")
+
+if __name__ == '__main__':
+    
+    from app import app
+    with app.app_context():
+        directories = sys.argv[1:] or [d for d in {getenv('IMAGES_LOCATION'), app.config['IMAGES_LOCATION']} if d]
+        backfill_upload_index(*[d for d in directories if path.isdir(d)])
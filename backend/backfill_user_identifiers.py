@@ -0,0 +1,53 @@
+import sys
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from web.extensions import db
+from web.apis.models.users import User, UserIdentifier
+
+def backfill_user_identifiers(batch_size=1000):
+    """
+    Rebuild the `user_identifiers` rows of every existing user, one transaction per batch.
+
+    When a batch hits the unique constraint (two users whose identifiers only differ by case or
+    surrounding spaces) it is replayed user by user and the conflicting users are reported, since
+    those accounts cannot sign in by the clashing identifier until one of them changes it.
+    """
+    table = User.__table__
+    query = select(table.c.id, table.c.username, table.c.email, table.c.phone).order_by(table.c.id)
+
+    synced, conflicts, batch = 0, [], []
+    for user in db.session.execute(query.execution_options(yield_per=batch_size)):
+        batch.append(user)
+        if len(batch) >= batch_size:
+            synced += sync_batch(batch, conflicts)
+            batch = []
+    if batch:
+        synced += sync_batch(batch, conflicts)
+
+    print(f"Synced identifiers of {synced} users. USER_IDENTIFIERS_FALLBACK can be turned off.")
+    for user in conflicts:
+        print(f"Conflict: user {user.id} ({user.username}, {user.email}, {user.phone})")
+    return synced, conflicts
+
+def sync_batch(batch, conflicts):
+    try:
+        with db.engine.begin() as connection:
+            for user in batch:
+                UserIdentifier.sync(connection, user)
+        return len(batch)
+    except IntegrityError:
+        synced = 0
+        for user in batch:
+            try:
+                with db.engine.begin() as connection:
+                    UserIdentifier.sync(connection, user)
+                synced += 1
+            except IntegrityError:
+                conflicts.append(user)
+        return synced
+
+if __name__ == '__main__':
+
+    from app import app
+    with app.app_context():
+        backfill_user_identifiers(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
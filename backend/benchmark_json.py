@@ -0,0 +1,55 @@
+"""
+Micro-benchmark: Flask's stdlib JSON provider vs. `MsgspecJSONProvider` on a paginated product
+listing (summaries with user, tags, categories and images, i.e. the largest list payloads).
+
+    python benchmark_json.py [products_per_page] [iterations]
+"""
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from web.json_provider import MsgspecJSONProvider
+
+def product_listing(count):
+    now = datetime.utcnow()
+    user = {
+        'id': 1, 'name': 'Benchmark User', 'username': 'benchmark', 'email': 'benchmark@example.com',
+        'phone': '08000000000', 'about_me': 'Sells things.', 'created_at': now - timedelta(days=30), 'updated_at': now,
+    }
+    products = [{
+        'id': i,
+        'name': f'Product {i}',
+        'price': Decimal('2500.00'),
+        'stock': 10,
+        'slug': f'product-{i}',
+        'comments_count': i % 7,
+        'tags': [{'id': t, 'name': f'tag-{t}'} for t in range(5)],
+        'categories': [{'id': c, 'name': f'category-{c}'} for c in range(3)],
+        'image_urls': [f'static/images/products/{i}-{n}.webp' for n in range(4)],
+        'users': [user],
+        'created_at': now - timedelta(minutes=i),
+        'updated_at': now,
+    } for i in range(count)]
+
+    return {
+        'success': True,
+        'message': 'Products fetched successfully.',
+        'products': products,
+        'page_meta': {'total_items_count': count, 'offset': 0, 'requested_page_size': count, 'current_page_number': 1},
+    }
+
+def main(count=50, iterations=500):
+    app = Flask(__name__)
+    payload = product_listing(count)
+
+    for name, provider in (('default', DefaultJSONProvider(app)), ('msgspec', MsgspecJSONProvider(app))):
+        with app.app_context():
+            seconds = timeit.timeit(lambda: provider.response(payload), number=iterations)
+            size = len(provider.response(payload).get_data())
+        print(f"{name:<10}{seconds / iterations * 1e3:>10.3f} ms/response{size:>10} bytes")
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,43 @@
+"""
+Micro-benchmark: `jsonschema.validate()` on every call vs. the precompiled validators in
+`web.apis.utils.validators`.
+
+    python benchmark_schemas.py [iterations]
+"""
+import sys
+import timeit
+import jsonschema
+from web.apis.utils.validators import schema_registry
+from web.apis.schemas.product import product_schema
+from web.apis.schemas.user import signup_schema
+from web.apis.schemas.chats import chat_event_schemas
+
+payloads = [
+    ('product_schema', product_schema, {
+        "name": "Benchmark product", "description": "A product used to time schema validation.",
+        "price": 2500, "stock": 10, "category": ["phones"], "tags": ["new"],
+    }),
+    ('signup_schema', signup_schema, {
+        "username": "benchmark", "phone": "08000000000", "email": "benchmark@example.com", "password": "S3cure-password",
+    }),
+    ('chat_event_schemas.save_chat_request', chat_event_schemas['save_chat_request'], {
+        "to_username": "alice", "from_username": "bob", "text": "hello",
+    }),
+]
+
+def main(iterations=2000):
+    print(f"{'schema':<40}{'jsonschema.validate':>22}{'compiled':>14}{'speedup':>10}")
+    for name, schema, data in payloads:
+        baseline = timeit.timeit(lambda: _validate(data, schema), number=iterations)
+        compiled = timeit.timeit(lambda: schema_registry.errors(data, schema), number=iterations)
+        print(f"{name:<40}{baseline / iterations * 1e6:>19.1f} us{compiled / iterations * 1e6:>11.1f} us"
+              f"{baseline / compiled:>9.1f}x")
+
+def _validate(data, schema):
+    try:
+        jsonschema.validate(data, schema)
+    except jsonschema.ValidationError:
+        pass
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,54 @@
+"""
+Sign-in hashing throughput against the number of hashing processes.
+
+Fires `requests` concurrent password checks from `clients` threads (standing in for request
+workers) at a `PasswordHasher` per worker count, and reports checks/s, latency and how many
+checks were shed with a 503.
+
+    python benchmark_signin.py [--workers 0 1 2 4] [--clients 16] [--requests 64] [--max-pending 16]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash
+from web.apis.utils.passwords import PasswordHasher, PasswordHashingBusy
+
+def bench(workers, clients, count, method, max_pending):
+    hasher = PasswordHasher(method=method, workers=workers, max_pending=max_pending, timeout=60)
+    pwhash = generate_password_hash('correct horse battery staple', method)
+    hasher.run(len, '')  # Start the pool before timing
+
+    def check(_):
+        started = time.perf_counter()
+        try:
+            assert hasher.verify(pwhash, 'correct horse battery staple')
+            return time.perf_counter() - started
+        except PasswordHashingBusy:
+            return None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(check, range(count)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(r for r in results if r is not None)
+    shed = len(results) - len(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0
+    print(f"{workers:>8}{len(latencies) / elapsed:>12.1f}{p95:>12.1f}{shed:>8}")
+
+    if hasher._executor is not None:
+        hasher._executor.shutdown()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({0, 1, 2, os.cpu_count() or 1}))
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent sign-ins')
+    parser.add_argument('--requests', type=int, default=64, help='Sign-ins per run')
+    parser.add_argument('--max-pending', type=int, default=16)
+    parser.add_argument('--method', default=os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1'))
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}{'checks/s':>12}{'p95 ms':>12}{'shed':>8}")
+    for workers in args.workers:
+        bench(workers, args.clients, args.requests, args.method, args.max_pending)
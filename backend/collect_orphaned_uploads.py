@@ -0,0 +1,150 @@
+import argparse
+import shutil
+import time
+from os import getenv, makedirs, path, remove, scandir
+from sqlalchemy import delete, or_, select
+from web.extensions import db
+from web.apis.models.file_uploads import FileUpload, UploadedContent
+
+# Sub-directories of IMAGES_LOCATION the API uploads into
+upload_dirs = ['products', 'categories', 'pages', 'uploads']
+
+def referenced_paths():
+    """
+    Normalized paths of every file still in use: the `file_path` and rendition paths of
+    `FileUpload` rows that are not soft-deleted and still belong to a product, category or tag.
+    Rows are streamed, only the paths are kept.
+    """
+    table = FileUpload.__table__
+    query = (
+        select(table.c.file_path, table.c.renditions)
+        .where(table.c.is_deleted.is_(False))
+        .where(or_(table.c.product_id.isnot(None), table.c.category_id.isnot(None), table.c.tag_id.isnot(None)))
+        .execution_options(yield_per=2000)
+    )
+
+    paths = set()
+    for file_path, renditions in db.session.execute(query):
+        paths.add(path.normcase(path.abspath(file_path)))
+        for rendition in (renditions or {}).values():
+            paths.add(path.normcase(path.abspath(rendition['path'])))
+    return paths
+
+def walk_files(directory):
+    """Yield (path, size, mtime) of every file under `directory`, one directory listing at a time."""
+    stack = [directory]
+    while stack:
+        for entry in scandir(stack.pop()):
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat()
+                yield entry.path, stat.st_size, stat.st_mtime
+
+def orphaned_files(directories, grace_days):
+    """Yield (path, size) of files no row references and not modified within the grace period."""
+    referenced = referenced_paths()
+    cutoff = time.time() - grace_days * 86400
+
+    for directory in directories:
+        for file_path, size, mtime in walk_files(directory):
+            if mtime < cutoff and path.normcase(path.abspath(file_path)) not in referenced:
+                yield file_path, size
+
+def still_referenced(batch):
+    """
+    Paths of `batch` a live `FileUpload` row points at now, as its file or as one of its
+    renditions. `referenced_paths()` is a snapshot taken before the walk, an upload may have
+    reused one of these files since.
+
+    Renditions sit next to their original and share its name (`<hash>_card.jpg` for `<hash>.png`),
+    so the rows are looked up by that common prefix and their renditions checked as well.
+    """
+    table = FileUpload.__table__
+    candidates = {path.normcase(path.abspath(file_path)): file_path for file_path in batch}
+    prefixes = set()
+    for file_path in batch:
+        stem = path.basename(file_path).split('_', 1)[0].split('.', 1)[0]
+        prefixes.add(path.join(path.dirname(file_path), stem))
+        prefixes.add(path.join(path.dirname(path.abspath(file_path)), stem))
+
+    rows = db.session.execute(
+        select(table.c.file_path, table.c.renditions)
+        .where(table.c.is_deleted.is_(False))
+        .where(or_(*[table.c.file_path.startswith(prefix, autoescape=True) for prefix in prefixes]))
+    )
+    referenced = set()
+    for file_path, renditions in rows:
+        referenced.add(path.normcase(path.abspath(file_path)))
+        for rendition in (renditions or {}).values():
+            referenced.add(path.normcase(path.abspath(rendition['path'])))
+    return {candidates[key] for key in referenced if key in candidates}
+
+def collect(batch, quarantine=None):
+    """Delete (or move under `quarantine`) a batch of files, then drop the rows pointing at them."""
+    referenced = still_referenced(batch)
+    batch = [file_path for file_path in batch if file_path not in referenced]
+    if not batch:
+        return
+
+    for file_path in batch:
+        try:
+            if quarantine:
+                target = path.join(quarantine, path.relpath(path.abspath(file_path), path.abspath(path.sep)))
+                makedirs(path.dirname(target), exist_ok=True)
+                shutil.move(file_path, target)
+            else:
+                remove(file_path)
+        except FileNotFoundError:
+            pass
+
+    # Index entries and ownerless rows would otherwise point at missing files
+    db.session.execute(delete(UploadedContent).where(UploadedContent.file_path.in_(batch)))
+    db.session.execute(delete(FileUpload.__table__).where(FileUpload.__table__.c.file_path.in_(batch)))
+    db.session.commit()
+
+def collect_orphaned_uploads(directories, grace_days=7, batch_size=500, dry_run=True, quarantine=None):
+    """
+    Find files under `directories` that no `FileUpload` row references anymore (e.g. images of
+    deleted products) and delete or quarantine them in batches. With `dry_run` nothing is touched
+    and only the report is printed.
+    """
+    count, reclaimed, batch = 0, 0, []
+    for file_path, size in orphaned_files(directories, grace_days):
+        count += 1
+        reclaimed += size
+        if dry_run:
+            print(f"[dry-run] {file_path} ({size} bytes)")
+            continue
+
+        batch.append(file_path)
+        if len(batch) >= batch_size:
+            collect(batch, quarantine)
+            batch = []
+
+    if batch:
+        collect(batch, quarantine)
+
+    action = 'Would reclaim' if dry_run else ('Quarantined' if quarantine else 'Reclaimed')
+    print(f"{action} {reclaimed} bytes in {count} orphaned files.")
+    return count, reclaimed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Delete uploaded files no longer referenced by any row.')
+    parser.add_argument('directories', nargs='*', help='Upload directories (default: the API upload directories)')
+    parser.add_argument('--grace-days', type=float, default=7, help='Keep files modified more recently than this')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--delete', action='store_true', help='Actually delete/quarantine (default is a dry run)')
+    parser.add_argument('--quarantine', help='Move orphans under this directory instead of deleting them')
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        directories = args.directories or [path.join(getenv('IMAGES_LOCATION', ''), d) for d in upload_dirs]
+        collect_orphaned_uploads(
+            [d for d in directories if path.isdir(d)],
+            grace_days=args.grace_days,
+            batch_size=args.batch_size,
+            dry_run=not args.delete,
+            quarantine=args.quarantine
+        )
@@ -0,0 +1,48 @@
+"""
+Move the old `blacklist` Redis set of revoked JWT ids to the per-token keys of
+`web.apis.utils.revocation`.
+
+    python migrate_blacklist.py [--ttl-days 30] [--keep]
+
+The set only holds ids, not expiry times, so each key gets `--ttl-days`. That should be at
+least the longest token lifetime: refresh tokens last 30 days, and JWT_ACCESS_TOKEN_EXPIRES
+is used as well when it is longer.
+"""
+import argparse
+from web.extensions import redis
+from web.apis.utils.revocation import revocation_store
+
+def migrate_blacklist(ttl_seconds, batch_size=1000, keep=False):
+    moved, batch = 0, []
+    for jti in redis.sscan_iter('blacklist', count=batch_size):
+        batch.append(jti.decode('utf-8'))
+        if len(batch) >= batch_size:
+            moved += write(batch, ttl_seconds)
+            batch = []
+    if batch:
+        moved += write(batch, ttl_seconds)
+
+    if not keep:
+        redis.delete('blacklist')
+    print(f"Migrated {moved} revoked token ids{'' if keep else ' and removed the blacklist set'}.")
+    return moved
+
+def write(batch, ttl_seconds):
+    pipe = redis.pipeline(transaction=False)
+    for jti in batch:
+        # Never shorten the TTL of a key written since by a signout
+        pipe.set(revocation_store.key(jti), 1, ex=ttl_seconds, nx=True)
+        pipe.publish(revocation_store.channel, jti)
+    pipe.execute()
+    return len(batch)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ttl-days', type=float, default=30, help='Lifetime of the migrated keys')
+    parser.add_argument('--keep', action='store_true', help='Leave the old set in place')
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        ttl = max(args.ttl_days * 86400, app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds())
+        migrate_blacklist(int(ttl), keep=args.keep)
@@ -0,0 +1,42 @@
+"""
+Apply stored payment webhooks (the `webhook_events` inbox) to their transactions.
+
+    python process_webhooks.py            # keep polling the inbox
+    python process_webhooks.py --once     # drain the inbox and exit
+
+Several processes can run at once: each batch is claimed with SKIP LOCKED.
+"""
+import argparse
+import time
+from web.apis.transactions.webhooks import process_webhook_events
+
+def process_webhooks(batch_size=100, max_attempts=5, retry_backoff=30, once=False, interval=2.0):
+    total = 0
+    while True:
+        handled = process_webhook_events(batch_size, max_attempts, retry_backoff)
+        total += handled
+        if handled:
+            print(f"Processed {handled} webhook events.")
+        elif once:
+            break
+        else:
+            time.sleep(interval)
+    print(f"Processed {total} webhook events in total.")
+    return total
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--once', action='store_true', help='Exit when the inbox is empty')
+    parser.add_argument('--batch-size', type=int, help='Events per batch (default: WEBHOOK_BATCH_SIZE)')
+    parser.add_argument('--interval', type=float, default=2.0, help='Seconds to wait when the inbox is empty')
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        process_webhooks(
+            batch_size=args.batch_size or app.config['WEBHOOK_BATCH_SIZE'],
+            max_attempts=app.config['WEBHOOK_MAX_ATTEMPTS'],
+            retry_backoff=app.config['WEBHOOK_RETRY_BACKOFF'],
+            once=args.once,
+            interval=args.interval
+        )
@@ -0,0 +1,12 @@
+from web.apis.models.categories import Category
+
+def rebuild_category_paths():
+    """Backfill the materialized `path` of every category, e.g. after adding the column."""
+    count = Category.rebuild_paths()
+    print(f"Rebuilt paths for {count} categories.")
+
+if __name__ == '__main__':
+    
+    from app import app
+    with app.app_context():
+        rebuild_category_paths()
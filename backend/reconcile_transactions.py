@@ -0,0 +1,29 @@
+"""
+Re-verify pending transactions (e.g. abandoned redirects) against Paystack and Flutterwave.
+
+    python reconcile_transactions.py [--batch-size 200] [--concurrency 8] [--min-age 30] [--provider paystack]
+
+Against the local stub: start `python stub_gateway.py serve` and run with
+PAYSTACK_BASE_URL=http://127.0.0.1:8090 FLUTTERWAVE_BASE_URL=http://127.0.0.1:8090.
+"""
+import argparse
+from web.apis.transactions.reconcile import reconcile_transactions, verifiers
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, help='Verify calls in flight per provider (default: RECONCILE_CONCURRENCY)')
+    parser.add_argument('--min-age', type=int, help='Skip transactions younger than this, in minutes (default: RECONCILE_MIN_AGE_MINUTES)')
+    parser.add_argument('--provider', action='append', choices=list(verifiers), help='Only this provider (repeatable)')
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        report = reconcile_transactions(
+            batch_size=args.batch_size,
+            concurrency=args.concurrency or app.config['RECONCILE_CONCURRENCY'],
+            min_age_minutes=app.config['RECONCILE_MIN_AGE_MINUTES'] if args.min_age is None else args.min_age,
+            providers=args.provider
+        )
+        for key, value in sorted(report.items()):
+            print(f"{key:<16}{value}")
@@ -0,0 +1,85 @@
+"""
+Local SMTP server that accepts and counts every message, for tests and mailer benchmarks
+(needs `pip install aiosmtpd`).
+
+    python smtp_sink.py serve [--port 8025] [--latency 0.05] [--print]
+    python smtp_sink.py bench [--port 8025] [--messages 200]
+
+Point the app at it with MAIL_SERVER=127.0.0.1 MAIL_PORT=8025 (and MAIL_USE_TLS unset).
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+from aiosmtpd.controller import Controller
+
+class SinkHandler:
+    def __init__(self, latency=0.0, echo=False):
+        self.latency = latency
+        self.echo = echo
+        self.messages = 0
+        self.lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        with self.lock:
+            self.messages += 1
+        if self.echo:
+            print(f"{envelope.mail_from} -> {', '.join(envelope.rcpt_tos)} ({len(envelope.content)} bytes)")
+        return '250 Message accepted'
+
+def serve(port=8025, latency=0.0, echo=False, block=True):
+    """Start the sink; with `block=False` it keeps running in the background and the controller is returned."""
+    handler = SinkHandler(latency, echo)
+    controller = Controller(handler, hostname='127.0.0.1', port=port)
+    controller.start()
+    if not block:
+        return controller
+    print(f"SMTP sink listening on 127.0.0.1:{port}")
+    try:
+        while True:
+            time.sleep(3600)
+    finally:
+        controller.stop()
+
+def bench(app, controller, count=200):
+    """Queue `count` messages through the app's mailer and time until the sink has them all."""
+    from web.apis.utils.email import send_email
+    from web.apis.utils.mailer import mailer
+
+    with app.test_request_context():
+        started = time.perf_counter()
+        for i in range(count):
+            send_email(f'Benchmark {i}', sender='bench@example.com', recipients=['sink@example.com'], text_body='Hello')
+        mailer().join()
+        elapsed = time.perf_counter() - started
+
+        print(f"{count} messages in {elapsed:.2f}s ({count / elapsed:.1f}/s), received {controller.handler.messages}")
+        for key, value in sorted(mailer().stats().items()):
+            print(f"{key:<14}{value}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['serve', 'bench'])
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every DATA answer')
+    parser.add_argument('--print', action='store_true', help='Print every message received')
+    parser.add_argument('--messages', type=int, default=200, help='Messages sent in bench mode')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.port, args.latency, args.print)
+    else:
+        controller = serve(args.port, args.latency, block=False)
+        try:
+            # Flask-Mail reads its settings when the app is created, so point the config at the sink first
+            os.environ.update(MAIL_SERVER='127.0.0.1', MAIL_PORT=str(args.port))
+            for name in ('MAIL_USE_TLS', 'MAIL_USERNAME', 'MAIL_PASSWORD'):
+                os.environ.pop(name, None)
+
+            from app import app
+            bench(app, controller, args.messages)
+        finally:
+            controller.stop()
@@ -0,0 +1,117 @@
+"""
+Local stand-in for the payment gateways, for tests and latency benchmarks.
+
+    python stub_gateway.py serve [--port 8090] [--latency 0.05] [--failure-rate 0.1]
+    python stub_gateway.py bench [--port 8090] [--requests 200]
+
+Point the app at it with PAYSTACK_BASE_URL=http://127.0.0.1:8090 and
+FLUTTERWAVE_BASE_URL=http://127.0.0.1:8090. It answers the endpoints the API calls
+(Paystack initialize/verify, Flutterwave payments/verify/verify_by_reference) with canned successful payloads.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def canned_response(method, path):
+    if method == 'POST' and path == '/transaction/initialize':
+        return {'status': True, 'data': {'authorization_url': 'https://checkout.example/stub', 'reference': 'stub'}}
+    if method == 'POST' and path == '/v3/payments':
+        return {'status': 'success', 'data': {'link': 'https://checkout.example/stub'}}
+
+    match = re.match(r'^/transaction/verify/(?P<id>[^/]+)$', path)
+    if match:
+        return {'status': True, 'data': {'id': match['id'], 'status': 'success', 'amount': 10 ** 9, 'currency': 'NGN'}}
+
+    if method == 'GET' and path == '/v3/transactions/verify_by_reference':
+        return {'status': 'success', 'data': {'id': 1, 'status': 'successful', 'amount': 10 ** 9, 'currency': 'NGN'}}
+
+    match = re.match(r'^/v3/transactions/(?P<id>[^/]+)/verify$', path)
+    if match:
+        return {'status': 'success', 'data': {'id': match['id'], 'status': 'successful', 'amount': 10 ** 9, 'currency': 'NGN'}}
+    return None
+
+class StubGatewayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real gateways
+    latency = 0.0
+    failure_rate = 0.0
+
+    def handle_request(self, method):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        time.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            return self.reply(503, {'status': False, 'message': 'Stub gateway failure'})
+
+        payload = canned_response(method, self.path.split('?', 1)[0])
+        if payload is None:
+            return self.reply(404, {'status': False, 'message': 'Not found'})
+        return self.reply(200, payload)
+
+    def reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(port=8090, latency=0.0, failure_rate=0.0, block=True):
+    """Start the stub; with `block=False` it runs in a daemon thread and the server is returned."""
+    handler = type('Handler', (StubGatewayHandler,), {'latency': latency, 'failure_rate': failure_rate})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    if not block:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    print(f"Stub gateway listening on http://127.0.0.1:{port}")
+    server.serve_forever()
+
+def bench(port=8090, count=200):
+    """Time `count` verify calls with a fresh connection each (bare `requests`) vs. the pooled client."""
+    import requests
+    from web.apis.utils.gateways import GatewayClient
+
+    base_url = f"http://127.0.0.1:{port}"
+    client = GatewayClient('stub', base_url)
+
+    for name, call in (
+        ('requests.get', lambda i: requests.get(f"{base_url}/transaction/verify/{i}")),
+        ('GatewayClient.get', lambda i: client.get(f"/transaction/verify/{i}")),
+    ):
+        started = time.perf_counter()
+        for i in range(count):
+            call(i).raise_for_status()
+        elapsed = time.perf_counter() - started
+        print(f"{name:<20}{elapsed / count * 1000:>8.2f} ms/request")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['serve', 'bench'])
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of requests answered with a 503')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per client in bench mode')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.port, args.latency, args.failure_rate)
+    else:
+        server = serve(args.port, args.latency, args.failure_rate, block=False)
+        try:
+            bench(args.port, args.requests)
+        finally:
+            server.shutdown()
@@ -1,5 +1,6 @@
 from flask import Flask
-from web.extensions import db, config_app, init_ext, make_available
+from web.extensions import db, config_app, init_ext, limiter, make_available
+from web.json_provider import init_json_provider
 
 # from web.apis.models import *
 
@@ -12,6 +13,7 @@ def create_app(config_name=None):
     try:
         # Configure the app
         config_app(app, config_name)
+        init_json_provider(app)
         init_ext(app)
         app.context_processor(make_available) # make some-data available in the context through-out
         # app.redis = redis
@@ -23,6 +25,11 @@ def create_app(config_name=None):
         from web.apis.transactions import transact_bp
         app.register_blueprint(transact_bp, url_prefix='/api')
         
+        from web.media import media_bp
+        # a page pulls many images at once, the default 1/second limit would throttle them
+        limiter.exempt(media_bp)
+        app.register_blueprint(media_bp)
+
         # error-bp
         from web.apis.errors.handlers import error_bp
         app.register_blueprint(error_bp)
@@ -84,6 +84,8 @@ from . import tags
 from . import chats
 # from .categories import Category, products_categories
 from . import categories
+from . import caches
+from . import mails
 # from .transactions import Transaction
 
 __all__ = [
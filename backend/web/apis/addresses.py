@@ -5,27 +5,27 @@ from sqlalchemy import desc
 from web.extensions import db
 from web.apis import api_bp as address_bp
 from web.apis.models.addresses import Address
-from web.apis.utils.serializers import PageSerializer, success_response, error_response
+from web.apis.utils.serializers import InvalidCursor, PageSerializer, paginate, success_response, error_response
 from web.apis.schemas.address import address_schema  
-from jsonschema import validate, ValidationError
+from jsonschema import ValidationError
+from web.apis.utils.validators import validate
 
 @address_bp.route('/addresses/<user_id>/user', methods=['GET'])
 @jwt_required()
 def user_addresses(user_id=None):
     """get addresses for the authenticated user with pagination."""
     try:
-        
-        page_size = request.args.get('page_size', 5, type=int)
-        page = request.args.get('page', 1, type=int)
         user_id = user_id or current_user.id
 
-        addresses = Address.query.filter_by(user_id=user_id).order_by(desc(Address.created_at)) \
-            .paginate(page=page, per_page=page_size)
+        addresses = paginate(Address.query.filter_by(user_id=user_id).order_by(desc(Address.created_at)), Address)
 
         data = PageSerializer(pagination_obj=addresses, resource_name="addresses", include_user=False).get_data()
         # data = PageSerializer(items=[addresses], resource_name="addresses", include_user=False).get_data()
         return success_response("Addresses fetched successfully", data=data)
 
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         return error_response(f"Unexpected error: {str(e)}", status_code=500)
     
@@ -44,15 +44,16 @@ def list_addresses(address_id=None):
             data = address.get_summary(include_user=True)
             return success_response("Address fetched successfully.", data=data)
         
-        page_size = request.args.get('page_size', 5, type=int)
-        page = request.args.get('page', 1, type=int)
         
-        addresses = Address.query.order_by(desc(Address.created_at)).paginate(page=page, per_page=page_size)
+        addresses = paginate(Address.query.order_by(desc(Address.created_at)), Address)
 
         data = PageSerializer(pagination_obj=addresses, resource_name="addresses", include_user=False).get_data()
         # data = PageSerializer(items=[addresses], resource_name="addresses", include_user=False).get_data()
         return success_response("Addresses fetched successfully", data=data)
 
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         traceback.print_exc()
         return error_response(f"Unexpected error: {str(e)}", status_code=500)
@@ -0,0 +1,38 @@
+import traceback
+from flask_jwt_extended import jwt_required
+from web.apis.utils.cache import summary_cache
+from web.apis.utils.decorators import access_required
+from web.apis.utils.serializers import error_response, success_response
+from web.apis import api_bp as cache_bp
+
+@cache_bp.route('/caches/stats', methods=['GET'])
+@jwt_required()
+@access_required('admin', 'dev')
+def cache_stats():
+    """
+    Hit/miss counters of the summary cache, per resource, used to size `SUMMARY_CACHE_TTL`.
+
+    :return: JSON response with the counters and the current TTL.
+    """
+    try:
+        data = {'ttl': summary_cache.ttl, 'stats': summary_cache.stats()}
+        return success_response("Cache stats fetched successfully.", data=data)
+    except Exception as e:
+        traceback.print_exc()
+        return error_response(f"An error occurred: {str(e)}", status_code=500)
+
+@cache_bp.route('/caches/stats', methods=['DELETE'])
+@jwt_required()
+@access_required('admin', 'dev')
+def reset_cache_stats():
+    """
+    Reset the summary cache hit/miss counters, e.g. after changing the TTL.
+
+    :return: JSON response indicating success or failure.
+    """
+    try:
+        summary_cache.reset_stats()
+        return success_response("Cache stats reset successfully.")
+    except Exception as e:
+        traceback.print_exc()
+        return error_response(f"An error occurred: {str(e)}", status_code=500)
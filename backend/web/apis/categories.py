@@ -2,7 +2,8 @@ import os
 import traceback
 from flask_jwt_extended import jwt_required
 from flask import request
-from jsonschema import ValidationError, validate
+from jsonschema import ValidationError
+from web.apis.utils.validators import validate
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from werkzeug.utils import secure_filename
 from web.apis.utils.decorators import access_required
@@ -11,8 +12,9 @@ from web.extensions import db, limiter
 from web.apis.models.categories import Category
 from web.apis.models.file_uploads import CategoryImage
 from web.apis.utils.helpers import validate_file_upload
+from web.apis.utils.images import queue_renditions
 from web.apis import api_bp as categories_bp
-from web.apis.utils.uploader import uploader
+from web.apis.utils.uploader import upload_many
 from web.apis.schemas.categories import category_schema
 
 @categories_bp.route('/categories', methods=['POST'])
@@ -44,22 +46,21 @@ def create_category():
             dir_path = os.getenv('IMAGES_LOCATION')
             dir_path = os.path.join(dir_path, 'categories')
 
-            for image in request.files.getlist('images[]'):
-                if image and validate_file_upload(image.filename):
-                    file_name = secure_filename(image.filename)
-                    file_path = uploader(image, upload_dir=dir_path)
-                    file_size = image.content_length or os.stat(file_path).st_size
+            images = [image for image in request.files.getlist('images[]') if image and validate_file_upload(image.filename)]
 
-                    ci = CategoryImage(
-                        file_path=file_path,
-                        file_name=file_name,
-                        original_name=image.filename,
-                        file_size=file_size
-                    )
-                    category.images.append(ci)
+            # Stored concurrently, results come back in upload order
+            for image, (file_path, file_size) in zip(images, upload_many(images, upload_dir=dir_path)):
+                ci = CategoryImage(
+                    file_path=file_path,
+                    file_name=secure_filename(image.filename),
+                    original_name=image.filename,
+                    file_size=file_size
+                )
+                category.images.append(ci)
 
         db.session.add(category)
         db.session.commit()
+        queue_renditions(category.images)
         return success_response("Category created successfully.", data=category.get_summary())
 
     except IntegrityError:
@@ -97,6 +98,25 @@ def get_categories(category_id=None):
     except Exception as e:
         return error_response(f"Error fetching categories: {str(e)}")
 
+@categories_bp.route('/categories/tree', methods=['GET'])
+@categories_bp.route('/categories/<int:category_id>/tree', methods=['GET'])
+def get_category_tree(category_id=None):
+    """
+    Return the full nested category tree (or the subtree under `category_id`) built from a single query.
+
+    :param category_id: Optional root of the subtree to return.
+    :return: JSON response with the nested categories.
+    """
+    try:
+        tree = Category.get_tree(root_id=category_id)
+        if category_id and not tree:
+            return error_response("Category not found.", status_code=404)
+
+        return success_response("Category tree fetched successfully.", data={'categories': tree})
+
+    except Exception as e:
+        return error_response(f"Error fetching category tree: {str(e)}")
+
 @categories_bp.route('/categories/<int:category_id>', methods=['PUT'])
 
 @jwt_required()
@@ -110,10 +130,18 @@ def update_category(category_id):
         data = request.json
         category.name = data.get('name', category.name)
         category.description = data.get('description', category.description)
+        if 'parent_id' in data:
+            # Moving re-prefixes the materialized path of the whole subtree on flush
+            category.parent_id = data['parent_id']
 
         db.session.commit()
         return success_response("Category updated successfully.")
 
+    except ValueError as e:
+        # Self-parenting or moving a category under its own descendant (Category.validate_parent)
+        db.session.rollback()
+        return error_response(str(e), status_code=400)
+
     except SQLAlchemyError as e:
         db.session.rollback()
         return error_response(f"Database error: {str(e)}")
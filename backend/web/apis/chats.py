@@ -4,11 +4,12 @@ from flask import request
 from flask_jwt_extended import current_user, jwt_required
 from sqlalchemy import and_, func, or_
 from web.apis.utils.chats import ConnectionManager
-from web.apis.utils.serializers import PageSerializer, error_response, success_response
+from web.apis.utils.serializers import InvalidCursor, PageSerializer, error_response, paginate, success_response
 from web.extensions import db, socketio as sio
 from web.apis.models.users import User
 from web.apis.models.chats import Chat, Group, user_group
 from web.apis.schemas.chats import chat_event_schemas
+from web.apis.utils.validators import validate
 
 connection_manager = ConnectionManager()
 
@@ -38,7 +39,7 @@ def handle_connect():
 def handle_typing(data):
     try:
         event_schema = chat_event_schemas['typing_request']
-        jsonschema.validate(data, event_schema)
+        validate(data, event_schema)
 
         from_username = data.get('from_username', connection_manager.get_socket(request.sid))
         if not User.get_user(from_username):
@@ -61,7 +62,7 @@ def save(data):
             return connection_manager.notify('save_chat_response', data=error)
 
         # Validate incoming data against the schema
-        jsonschema.validate(instance=data, schema=chat_event_schemas['save_chat_request'])
+        validate(instance=data, schema=chat_event_schemas['save_chat_request'])
 
         sender = current_user
         recipient_username = data.get('to_username')
@@ -168,7 +169,7 @@ def fetch(username):
     try:
         print("fetch_chat_request event received", request.sid, username)
         username = current_user.username if current_user else username
-        jsonschema.validate(username, chat_event_schemas['fetch_chat_request'])
+        validate(username, chat_event_schemas['fetch_chat_request'])
 
         user = User.get_user(username)
         if not user:
@@ -178,17 +179,17 @@ def fetch(username):
         # chats = Chat.query.filter(Chat.group_id.in_([room.id for room in user.groups])).order_by(Chat.created.desc()).all()
         
         # Pagination
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-
-        chats = Chat.query.filter(Chat.group_id.in_([room.id for room in user.groups])).order_by(Chat.created.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
+        chats = paginate(
+            Chat.query.filter(Chat.group_id.in_([room.id for room in user.groups])).order_by(Chat.created_at.desc()),
+            Chat, page_size=10, page_size_arg='per_page', error_out=False
         )
         data = PageSerializer(pagination_obj=chats, resource_name="chats").get_data()
         data = success_response('Chats fetched successfully.', data=data)
         return connection_manager.notify('fetch_chat_response', data)
     except jsonschema.exceptions.ValidationError as e:
         return connection_manager.notify('fetch_chat_response', error_response('Validation error', str(e)))
+    except InvalidCursor as e:
+        return connection_manager.notify('fetch_chat_response', error_response(str(e), status_code=400))
     except Exception as e:
         return connection_manager.notify('fetch_chat_response', error_response('An error occurred', str(e)))
 
@@ -197,7 +198,7 @@ def fetch(username):
 def remove(data):
     try:
         print("remove_chat_request event received", request.sid)
-        jsonschema.validate(data, chat_event_schemas['remove_chat_request'])
+        validate(data, chat_event_schemas['remove_chat_request'])
         username = data['user_id']
 
         chat = Chat.query.get(data['chat_id'])
@@ -218,7 +219,7 @@ def remove(data):
 def update(data):
     try:
         print("update event received", request.sid)
-        jsonschema.validate(data, chat_event_schemas['update_chat_request'])
+        validate(data, chat_event_schemas['update_chat_request'])
         username = data['from_username']
         chat = Chat.query.get(data['chat_id'])
         if not chat or chat.from_user != username:
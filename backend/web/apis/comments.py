@@ -1,11 +1,12 @@
 import traceback
 from flask import request
-from flask_jwt_extended import jwt_required, get_jwt, current_user
-from jsonschema import ValidationError, validate
+from flask_jwt_extended import jwt_required, current_user
+from jsonschema import ValidationError
+from web.apis.utils.validators import validate, validate_json
 from sqlalchemy import desc
 from sqlalchemy.exc import SQLAlchemyError
 from web.apis.utils.decorators import access_required
-from web.apis.utils.serializers import PageSerializer, error_response, success_response
+from web.apis.utils.serializers import InvalidCursor, PageSerializer, error_response, paginate, success_response
 from web.apis.models.products import Product
 from web.apis.models.comments import Comment
 from web.apis.schemas.comment import comment_schema
@@ -18,9 +19,6 @@ from web.apis import api_bp as comment_bp
 def list_comments(product_slug=None):
     try:
         # If product_slug is provided, fetch its comments
-        page_size = request.args.get('page_size', 5, type=int)
-        page = request.args.get('page', 1, type=int)
-            
         if product_slug:
             product = Product.query.filter_by(slug=product_slug).first()
             if not product:
@@ -28,14 +26,14 @@ def list_comments(product_slug=None):
             
             product_id = product.id
 
-            comments = Comment.query.filter_by(product_id=product_id).order_by(
-                desc(Comment.created_at) ).paginate(page=page, per_page=page_size)
+            comments = paginate(Comment.query.filter_by(product_id=product_id).order_by(
+                desc(Comment.created_at) ), Comment)
 
             data = PageSerializer(pagination_obj=comments, resource_name="comments", include_user=True).get_data()
             return success_response("Comments fetched successfully.", data=data)
         
         # fetch - return all comments if slug is not provided
-        comments = Comment.query.order_by(desc(Comment.created_at) ).paginate(page=page, per_page=page_size)
+        comments = paginate(Comment.query.order_by(desc(Comment.created_at) ), Comment)
         data = PageSerializer(pagination_obj=comments, resource_name="comments", include_user=True).get_data()
         return success_response("Comments fetched successfully.", data=data)
     
@@ -43,6 +41,9 @@ def list_comments(product_slug=None):
         db.session.rollback()
         traceback.print_exc()
         return error_response(f"Database error: {str(e)}", status_code=500)
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         traceback.print_exc()
         return error_response(f"Unexpected error: {str(e)}", status_code=500)
@@ -62,18 +63,12 @@ def show_comment(comment_id):
 # @comment_bp.route('/products/<product_slug>/comments', methods=['POST'])
 @comment_bp.route('/comments/<product_slug>/products', methods=['POST'])
 @jwt_required()
+@validate_json(comment_schema)
 def create_comment(product_slug):
     try:
         data = request.json
         
-        # Validate incoming data against JSON schema
-        try:
-            validate(instance=data, schema=comment_schema)
-        except ValidationError as e:
-            return error_response(f"Validation error: {e.message}", status_code=400)
-        
-        claims = get_jwt()
-        user_id = claims.get('id')
+        user_id = current_user.id
 
         # Fetch the product by slug
         product = Product.query.filter_by(slug=product_slug).first()
@@ -116,6 +116,20 @@ def error_500(error):
         error_bp.logger.error(f"Error handling 500: {str(e)}")
         return error_response("An error occurred while processing the 500 error", 500)
     
+@error_bp.app_errorhandler(503)
+def error_503(error):
+    """
+    Handle 503 errors (e.g. password hashing shedding load) with a JSON response, keeping Retry-After.
+    """
+    try:
+        response, status_code = error_response(getattr(error, 'description', None) or "Service unavailable", 503)
+        retry_after = getattr(error, 'retry_after', None)
+        return response, status_code, ({'Retry-After': str(retry_after)} if retry_after else {})
+    except Exception as e:
+        # Log the exception
+        error_bp.logger.error(f"Error handling 503: {str(e)}")
+        return error_response("An error occurred while processing the 503 error", 503)
+    
 from jwt.exceptions import ExpiredSignatureError
 @error_bp.app_errorhandler(ExpiredSignatureError)
 def handle_expired_jwt_token(error):
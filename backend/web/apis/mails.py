@@ -0,0 +1,22 @@
+import traceback
+from flask_jwt_extended import jwt_required
+from web.apis.utils.decorators import access_required
+from web.apis.utils.mailer import mailer
+from web.apis.utils.serializers import error_response, success_response
+from web.apis import api_bp as mail_bp
+
+@mail_bp.route('/mails/stats', methods=['GET'])
+@jwt_required()
+@access_required('admin', 'dev')
+def mail_stats():
+    """
+    Queue depth and sent/retried/failed/dropped counters of this process's background mailer,
+    used to size `MAIL_WORKERS` and `MAIL_QUEUE_SIZE`.
+
+    :return: JSON response with the mailer stats.
+    """
+    try:
+        return success_response("Mail stats fetched successfully.", data=mailer().stats())
+    except Exception as e:
+        traceback.print_exc()
+        return error_response(f"An error occurred: {str(e)}", status_code=500)
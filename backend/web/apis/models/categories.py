@@ -1,6 +1,6 @@
 from slugify import slugify
-from sqlalchemy import event, func
-from sqlalchemy.orm import backref, validates
+from sqlalchemy import event, func, inspect, literal, select, update
+from sqlalchemy.orm import attributes, backref, validates
 from web.extensions import db
 
 # from apis.ecommerce_api.factory import db
@@ -30,21 +30,108 @@ class Category(db.Model):
     # Self-referential relationship + nested categorization using same table.
     parent_id = db.Column(db.Integer, db.ForeignKey('categories.id'), index=True, nullable=True)
     parent = db.relationship('Category', remote_side=[id], backref=backref('children', lazy='dynamic'))
+
+    # Materialized path of ancestor ids including self, e.g. '/1/5/12/'. Maintained by the
+    # insert/update hooks below, so a whole subtree is one `path LIKE '/1/5/%'` range scan.
+    path = db.Column(db.String(255), index=True, nullable=True)
     
     @validates('parent_id')
     def validate_parent(self, key, parent_id):
         if parent_id is not None and parent_id == self.id:
             raise ValueError("A category cannot be its own parent.")
         
-        # Check for circular references
-        current = self
-        while current.parent:
-            if current.parent.id == self.id:
+        # Check for circular references: the new parent must not sit inside this category's subtree
+        if parent_id is not None and self.path:
+            with db.session.no_autoflush:
+                parent_path = db.session.query(Category.path).filter(Category.id == parent_id).scalar()
+            if parent_path and parent_path.startswith(self.path):
                 raise ValueError("Circular reference detected.")
-            current = current.parent
         
         return parent_id
 
+    @staticmethod
+    def get_tree(root_id=None):
+        """
+        Static method to build the nested category tree from a single query on the materialized path.
+        
+        Args:
+            root_id (int, optional): Only return the subtree under this category (inclusive).
+        
+        Returns:
+            list[dict]: The top-level nodes, each with nested `children`.
+        """
+        query = db.session.query(
+            Category.id, Category.parent_id, Category.name, Category.slug, Category.description, Category.path
+        ).filter(Category.is_deleted.is_(False))
+
+        if root_id is not None:
+            root_path = select(Category.path).where(Category.id == root_id).scalar_subquery()
+            query = query.filter(Category.path.like(root_path + '%'))
+
+        nodes = {}
+        roots = []
+        for row in query.order_by(Category.path):
+            nodes[row.id] = {
+                'id': row.id,
+                'parent_id': row.parent_id,
+                'name': row.name,
+                'slug': row.slug,
+                'description': row.description,
+                'children': [],
+            }
+            # Rows come sorted by path, so a parent is always seen before its children
+            parent = nodes.get(row.parent_id)
+            if parent is not None:
+                parent['children'].append(nodes[row.id])
+            else:
+                roots.append(nodes[row.id])
+
+        return roots
+
+    @staticmethod
+    def subtree_select(category_id):
+        """
+        Static method returning a `SELECT id` of a category and all of its descendants, to embed
+        in another statement (e.g. `IN (...)`) so the subtree is resolved by the same query.
+        """
+        root_path = select(Category.path).where(Category.id == category_id).scalar_subquery()
+        return select(Category.id).where(Category.path.like(root_path + '%'))
+
+    @staticmethod
+    def get_subtree_ids(category_id):
+        """
+        Static method to fetch the ids of a category and all of its descendants in one indexed query.
+        """
+        return list(db.session.scalars(Category.subtree_select(category_id)))
+
+    @staticmethod
+    def rebuild_paths():
+        """
+        Static method to (re)compute every category's materialized path, e.g. for rows created before
+        the `path` column existed. Loads `(id, parent_id)` once and writes the paths in bulk.
+        """
+        parents = dict(db.session.query(Category.id, Category.parent_id))
+        paths = {}
+
+        def path_of(id, seen=()):
+            if id not in paths:
+                parent_id = parents.get(id)
+                if parent_id is None or parent_id in seen:
+                    paths[id] = f"/{id}/"
+                else:
+                    paths[id] = f"{path_of(parent_id, seen + (id,))}{id}/"
+            return paths[id]
+
+        for id in parents:
+            path_of(id)
+
+        db.session.execute(
+            update(Category),
+            [{'id': id, 'path': path} for id, path in paths.items()]
+        )
+        db.session.commit()
+        return len(paths)
+
     # def get_summary(self, include_products=None):
     #     data = {
     #         'id': self.id,
@@ -67,7 +154,8 @@ class Category(db.Model):
             'parent_id': self.parent_id,
             'name': self.name,
             'description': self.description,
-            'image_urls': [image.file_path.replace('\\', '/') for image in self.images] if self.images else None,
+            'image_urls': [image.display_url() for image in self.images] if self.images else None,
+            'images': [image.get_summary() for image in self.images],
             'children': [child.get_summary(depth=depth + 1, max_depth=max_depth) for child in self.children] if self.children else None,
             'parent': self.parent.get_summary(depth=depth + 1, max_depth=max_depth) if self.parent and depth < max_depth else None
         }
@@ -85,5 +173,37 @@ class Category(db.Model):
 def receive_set(target, value, oldvalue, initiator):
     target.slug = slugify(value)  # Removed unicode() as it is not necessary in Python 3
 
+def _parent_path(connection, parent_id):
+    if parent_id is None:
+        return '/'
+    table = Category.__table__
+    return connection.scalar(select(table.c.path).where(table.c.id == parent_id)) or f"/{parent_id}/"
 
+@event.listens_for(Category, 'after_insert')
+def set_path(mapper, connection, target):
+    # The id only exists once the row is inserted, so the path is written right after
+    path = f"{_parent_path(connection, target.parent_id)}{target.id}/"
+    table = Category.__table__
+    connection.execute(update(table).where(table.c.id == target.id).values(path=path))
+    attributes.set_committed_value(target, 'path', path)
+
+@event.listens_for(Category, 'after_update')
+def move_path(mapper, connection, target):
+    if not inspect(target).attrs.parent_id.history.has_changes():
+        return
+
+    old_path = target.path
+    new_path = f"{_parent_path(connection, target.parent_id)}{target.id}/"
+    table = Category.__table__
+
+    if old_path:
+        # Re-prefix the whole subtree (self included) in one statement
+        connection.execute(
+            update(table)
+            .where(table.c.path.like(old_path + '%'))
+            .values(path=literal(new_path) + func.substr(table.c.path, len(old_path) + 1))
+        )
+    else:
+        connection.execute(update(table).where(table.c.id == target.id).values(path=new_path))
 
+    attributes.set_committed_value(target, 'path', new_path)
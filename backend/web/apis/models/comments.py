@@ -1,6 +1,7 @@
 
-from sqlalchemy import func
+from sqlalchemy import event, func
 from web.extensions import db
+from web.apis.utils.cache import summary_cache
 
 class Comment(db.Model):
     __tablename__ = 'comments'
@@ -48,3 +49,9 @@ class Comment(db.Model):
             #     'username': self.user.username
             # }
         return data
+
+@event.listens_for(Comment, 'after_insert')
+@event.listens_for(Comment, 'after_delete')
+def invalidate_product_summary(mapper, connection, target):
+    # The cached product summary carries `comments_count`
+    summary_cache.invalidate('product', target.product_id)
@@ -1,5 +1,8 @@
-from sqlalchemy import func
+from os import path
+from sqlalchemy import event, func, select, update
+from sqlalchemy.exc import IntegrityError
 from web.extensions import db
+from web.apis.utils.cache import summary_cache
 
 class FileUpload(db.Model):
     __tablename__ = 'file_uploads'
@@ -11,6 +14,19 @@ class FileUpload(db.Model):
     file_size = db.Column(db.Integer, nullable=False)
     original_name = db.Column(db.String(140), nullable=False)
 
+    # Image renditions are rendered in the background (see `web.apis.utils.images`):
+    # status is 'pending' until they are stored, then 'ready' or 'failed'
+    status = db.Column(db.String(15), nullable=True, default='pending')
+    renditions = db.Column(db.JSON, nullable=True)  # {name: {'path', 'width', 'height', 'format', 'size'}}
+
+    # 64-bit dHash of the image (hex) and its four 16-bit bands, indexed for near-duplicate lookups
+    phash = db.Column(db.String(16), nullable=True, index=True)
+    phash_band_0 = db.Column(db.Integer, nullable=True, index=True)
+    phash_band_1 = db.Column(db.Integer, nullable=True, index=True)
+    phash_band_2 = db.Column(db.Integer, nullable=True, index=True)
+    phash_band_3 = db.Column(db.Integer, nullable=True, index=True)
+    duplicate_of_id = db.Column(db.Integer, db.ForeignKey('file_uploads.id'), nullable=True)
+
     is_deleted = db.Column(db.Boolean(), nullable=False, index=True, default=False)
     created_at = db.Column(db.DateTime, nullable=False, index=True, default=func.now())
     updated_at = db.Column(db.DateTime, nullable=False, default=func.now(), onupdate=func.now())
@@ -20,6 +36,70 @@ class FileUpload(db.Model):
         'polymorphic_identity': 'FileUpload'
     }
 
+    def get_summary(self):
+        return {
+            'id': self.id,
+            'url': self.file_path.replace('\\', '/'),
+            'status': self.status,
+            'renditions': {
+                name: rendition['path'].replace('\\', '/') for name, rendition in (self.renditions or {}).items()
+            },
+            'duplicate_of': self.duplicate_of_id,
+        }
+
+    def display_url(self, rendition='card'):
+        """
+        URL listed in `image_urls`: the `rendition` once it is rendered, the original (also in
+        `get_summary()['url']`) while it is pending or failed.
+        """
+        stored = (self.renditions or {}).get(rendition) if self.status == 'ready' else None
+        return (stored['path'] if stored else self.file_path).replace('\\', '/')
+
+    @staticmethod
+    def phash_bands(phash):
+        """Split a 64-bit hash into four 16-bit bands, most significant first."""
+        value = int(phash, 16)
+        return [(value >> shift) & 0xFFFF for shift in (48, 32, 16, 0)]
+
+    @staticmethod
+    def find_near_duplicates(phash, max_distance=3, exclude_ids=(), max_candidates=500):
+        """
+        Ids of the uploads whose perceptual hash is within `max_distance` bits of `phash`, closest
+        first (earliest upload first among equals).
+
+        Two hashes differing in at most 3 bits share at least one of their four bands, so only
+        rows matching a band (an indexed lookup) are compared; `max_distance` is clamped to 3.
+        All-0 and all-1 bands (plain backgrounds) are shared by a large part of the catalog and
+        are not looked up, and at most `max_candidates` rows are compared.
+
+        Returns:
+            list: (distance, id) tuples.
+        """
+        max_distance = min(max_distance, 3)
+        bands = [
+            (i, band) for i, band in enumerate(FileUpload.phash_bands(phash)) if band not in (0x0000, 0xFFFF)
+        ]
+        if not bands:
+            return []
+
+        table = FileUpload.__table__
+        candidates = db.session.execute(
+            select(table.c.id, table.c.phash)
+            .where(db.or_(*[table.c[f'phash_band_{i}'] == band for i, band in bands]))
+            .where(table.c.is_deleted.is_(False))
+            .where(table.c.id.notin_(exclude_ids))
+            .order_by(table.c.id)
+            .limit(max_candidates)
+        )
+
+        value = int(phash, 16)
+        matches = []
+        for candidate_id, candidate_phash in candidates:
+            distance = bin(value ^ int(candidate_phash, 16)).count('1')
+            if distance <= max_distance:
+                matches.append((distance, candidate_id))
+        return sorted(matches)
+
 
 class TagImage(FileUpload):
     tag_id = db.Column(db.Integer, db.ForeignKey('tags.id'), nullable=True)
@@ -61,3 +141,51 @@ class CategoryImage(FileUpload):
     __mapper_args__ = {
         'polymorphic_identity': 'CategoryImage'
     }
+
+
+class UploadedContent(db.Model):
+    """
+    Content-hash index of stored uploads (`sha256 -> file_path`), so duplicate uploads are found
+    with one indexed lookup instead of re-hashing the whole upload folder.
+    """
+    __tablename__ = 'uploaded_contents'
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False, unique=True, index=True)
+    file_path = db.Column(db.String(255), nullable=False, index=True)
+    file_size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=func.now())
+
+    # Reads/writes go through their own connection so they never flush or roll back the
+    # caller's session (uploads happen while a product/page is still pending in it).
+
+    @staticmethod
+    def lookup(sha256):
+        """
+        Return the stored path for a content hash, or None if unknown or the file is gone from disk.
+        """
+        table = UploadedContent.__table__
+        with db.engine.connect() as conn:
+            file_path = conn.execute(select(table.c.file_path).where(table.c.sha256 == sha256)).scalar()
+
+        if file_path and path.isfile(file_path):
+            return file_path
+        return None
+
+    @staticmethod
+    def remember(sha256, file_path, file_size):
+        """Index `file_path` under `sha256`, repointing the hash if it was already indexed."""
+        table = UploadedContent.__table__
+        values = {'file_path': file_path, 'file_size': file_size}
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(table.insert().values(sha256=sha256, **values))
+        except IntegrityError:
+            with db.engine.begin() as conn:
+                conn.execute(update(table).where(table.c.sha256 == sha256).values(**values))
+
+@event.listens_for(ProductImage, 'after_insert')
+@event.listens_for(ProductImage, 'after_delete')
+def invalidate_product_summary(mapper, connection, target):
+    # The cached product summary carries `image_urls`
+    if target.product_id is not None:
+        summary_cache.invalidate('product', target.product_id)
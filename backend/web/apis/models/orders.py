@@ -31,7 +31,7 @@ class Order(db.Model):
     user = db.relationship('User', backref='orders')
 
     is_deleted = db.Column(db.Boolean(), nullable=False, default=False)
-    created_at = db.Column(db.DateTime, nullable=False, default=func.now())
+    created_at = db.Column(db.DateTime, index=True, nullable=False, default=func.now())
     updated_at = db.Column(db.DateTime, nullable=False, default=func.now(), onupdate=func.now())
 
     def get_summary(self, include_order_items=False, include_users=False):
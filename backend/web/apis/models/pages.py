@@ -1,6 +1,7 @@
-from sqlalchemy import func, or_
+from sqlalchemy import func, inspect, or_
 # from web.apis.utils.custom_mixins import SearchableMixin
 from web.extensions import db
+from web.apis.utils.cache import summary_cache
 
 products_pages = \
     db.Table(
@@ -88,6 +89,25 @@ class Page(db.Model):
         
         return page
 
+    @staticmethod
+    def get_cached_summary(identifier: str):
+        """
+        Static method to fetch a page summary by ID or slug through the Redis read-through cache.
+        
+        Args:
+            identifier (str): The page ID or slug to search for.
+        
+        Returns:
+            dict: The page's `get_summary()` payload if found, otherwise None.
+        
+        Raises:
+            ValueError: If the identifier is empty.
+        """
+        if not identifier:
+            raise ValueError("Identifier cannot be empty")
+
+        return summary_cache.get('page', identifier, Page.get_page)
+
     def get_summary(self, include_products=False, include_users=False):
         """Generate a summary of the page instance."""
         data = {
@@ -120,3 +140,10 @@ from sqlalchemy import event
 @event.listens_for(Page.name, 'set')
 def receive_set(target, value, oldvalue, initiator):
     target.slug = slugify(str(value))
+
+@event.listens_for(Page, 'after_update')
+@event.listens_for(Page, 'after_delete')
+def invalidate_cached_summary(mapper, connection, target):
+    # Drop the current slug and any slug replaced in this flush as well
+    old_slugs = inspect(target).attrs.slug.history.deleted or ()
+    summary_cache.invalidate('page', target.id, target.slug, *old_slugs)
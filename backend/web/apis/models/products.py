@@ -1,12 +1,15 @@
 from slugify import slugify
-from sqlalchemy import event, func, or_
+from sqlalchemy import event, func, inspect, or_
 from sqlalchemy.orm import relationship
 
 from web.extensions import db
-from web.apis.models.users import products_users
-from web.apis.models.categories import products_categories
-from web.apis.models.tags import products_tags
-from web.apis.models.pages import products_pages
+from web.apis.models.users import User, products_users
+from web.apis.models.categories import Category, products_categories
+from web.apis.models.tags import Tag, products_tags
+from web.apis.models.pages import Page, products_pages
+from web.apis.models.comments import Comment
+from web.apis.models.file_uploads import ProductImage
+from web.apis.utils.cache import summary_cache
 
 class Product(db.Model):
     __tablename__ = 'products'
@@ -22,7 +25,7 @@ class Product(db.Model):
 
     publish_on = db.Column(db.DateTime, index=True, default=func.now())
     is_deleted = db.Column(db.Boolean(), nullable=False, default=False)
-    created_at = db.Column(db.DateTime, nullable=False, default=func.now())
+    created_at = db.Column(db.DateTime, index=True, nullable=False, default=func.now())
     updated_at = db.Column(db.DateTime, nullable=False, default=func.now(), onupdate=func.now())
 
     users = db.relationship('User', secondary=products_users, lazy='dynamic', back_populates='products')
@@ -59,6 +62,25 @@ class Product(db.Model):
         
         return product
 
+    @staticmethod
+    def get_cached_summary(identifier: str):
+        """
+        Static method to fetch a product summary by ID or slug through the Redis read-through cache.
+        
+        Args:
+            identifier (str): The product ID or slug to search for.
+        
+        Returns:
+            dict: The product's `get_summary()` payload if found, otherwise None.
+        
+        Raises:
+            ValueError: If the identifier is empty.
+        """
+        if not identifier:
+            raise ValueError("Identifier cannot be empty")
+
+        return summary_cache.get('product', identifier, Product.get_product)
+
     def get_summary(self, include_user=False, include_page=False):
         data = {
             'id': self.id,
@@ -71,7 +93,8 @@ class Product(db.Model):
             'tags': [{'id': t.id, 'name': t.name} for t in self.tags],
             'categories': [{'id': c.id, 'name': c.name} for c in self.categories],
             # 'image_urls': [i.file_path for i in self.images],
-            'image_urls': [ image.file_path.replace('\\', '/') for image in self.images ] if self.images else None,
+            'image_urls': [ image.display_url() for image in self.images ] if self.images else None,
+            'images': [ image.get_summary() for image in self.images ],
         }
         
         if include_user and self.users:
@@ -82,7 +105,117 @@ class Product(db.Model):
             
         return data
 
+    @staticmethod
+    def get_summaries(products, include_user=False, include_page=False):
+        """
+        Batch version of `get_summary()` for a whole page of products.
+
+        Instead of the per-row `comments.count()` and lazy loads of tags, categories
+        and images (4+ queries per product), everything is fetched with one IN query
+        per relation plus one grouped comment count, so the cost is constant per page.
+
+        Args:
+            products (list[Product]): The products to summarize.
+            include_user (bool): Include the users attached to each product.
+            include_page (bool): Include the pages attached to each product.
+
+        Returns:
+            list[dict]: Summaries in the same order and shape as `get_summary()`.
+        """
+        products = list(products)
+        ids = [product.id for product in products]
+        if not ids:
+            return []
+
+        comments_count = dict(
+            db.session.query(Comment.product_id, func.count(Comment.id))
+            .filter(Comment.product_id.in_(ids))
+            .group_by(Comment.product_id)
+        )
+
+        tags = _group_rows(
+            db.session.query(products_tags.c.product_id, Tag.id, Tag.name)
+            .join(Tag, Tag.id == products_tags.c.tag_id)
+            .filter(products_tags.c.product_id.in_(ids))
+            .order_by(Tag.id),
+            lambda row: {'id': row[1], 'name': row[2]}
+        )
+
+        categories = _group_rows(
+            db.session.query(products_categories.c.product_id, Category.id, Category.name)
+            .join(Category, Category.id == products_categories.c.category_id)
+            .filter(products_categories.c.product_id.in_(ids))
+            .order_by(Category.id),
+            lambda row: {'id': row[1], 'name': row[2]}
+        )
+
+        images = _group_rows(
+            db.session.query(ProductImage.product_id, ProductImage)
+            .filter(ProductImage.product_id.in_(ids))
+            .order_by(ProductImage.id),
+            lambda row: row[1]
+        )
+
+        users = {}
+        if include_user:
+            users = _group_rows(
+                db.session.query(products_users.c.product_id, User)
+                .join(User, User.id == products_users.c.user_id)
+                .filter(products_users.c.product_id.in_(ids))
+                .order_by(User.id),
+                lambda row: row[1].get_summary()
+            )
+
+        pages = {}
+        if include_page:
+            pages = _group_rows(
+                db.session.query(products_pages.c.product_id, Page)
+                .join(Page, Page.id == products_pages.c.page_id)
+                .filter(products_pages.c.product_id.in_(ids))
+                .order_by(Page.id),
+                lambda row: row[1].get_summary()
+            )
+
+        summaries = []
+        for product in products:
+            data = {
+                'id': product.id,
+                'name': product.name,
+                'price': product.price,
+                'stock': product.stock,
+                'slug': product.slug,
+                'comments_count': comments_count.get(product.id, 0),
+                'tags': tags.get(product.id, []),
+                'categories': categories.get(product.id, []),
+                'image_urls': [image.display_url() for image in images.get(product.id, [])],
+                'images': [image.get_summary() for image in images.get(product.id, [])],
+            }
+
+            if include_user:
+                data['users'] = users.get(product.id, [])
+
+            if include_page:
+                data['pages'] = pages.get(product.id, [])
+
+            summaries.append(data)
+
+        return summaries
+
+def _group_rows(rows, build):
+    """Group `(product_id, ...)` rows into `{product_id: [build(row), ...]}`."""
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row[0], []).append(build(row))
+    return grouped
+
 
 @event.listens_for(Product.name, 'set')
 def receive_set(target, value, oldvalue, initiator):
-    target.slug = slugify(str(value))
\ No newline at end of file
+    target.slug = slugify(str(value))
+
+@event.listens_for(Product, 'after_update')
+@event.listens_for(Product, 'after_delete')
+def invalidate_cached_summary(mapper, connection, target):
+    # Drop the current slug and any slug replaced in this flush as well
+    old_slugs = inspect(target).attrs.slug.history.deleted or ()
+    summary_cache.invalidate('product', target.id, target.slug, *old_slugs)
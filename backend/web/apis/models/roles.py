@@ -1,7 +1,10 @@
 # from datetime import datetime, timezone
 
-from sqlalchemy import func
+import time
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import object_session
 from web.extensions import db
+from web.apis.utils.cache import auth_user_cache
 
 users_roles = db.Table(
     'users_roles',
@@ -29,6 +32,36 @@ class Role(db.Model):
             data['users'] = [ user.get_summary() for user in self.users ]
         
         return data
+
+    # Per-process name -> id map used to build role bitmasks
+    _ids = {}
+    _ids_loaded_at = float('-inf')
+
+    @staticmethod
+    def mask(*names, max_age=300, miss_interval=30):
+        """
+        Bitmask of the roles called `names`, with bit `role.id` set for each one. This is the
+        format of the 'rl' JWT claim. Unknown names (and '*') add no bit.
+
+        The name -> id map is reloaded after `max_age` seconds. A name missing from it (a role
+        created since, or one that is never seeded, like 'dev') reloads it at most once every
+        `miss_interval` seconds, so role checks naming it do not query on every request.
+        """
+        age = time.monotonic() - Role._ids_loaded_at
+        missing = any(name not in Role._ids for name in names if name != '*')
+        if age > max_age or (missing and age > miss_interval):
+            Role._ids = dict(db.session.execute(select(Role.name, Role.id)).all())
+            Role._ids_loaded_at = time.monotonic()
+        return sum(1 << Role._ids[name] for name in set(names) if name in Role._ids)
+
+@event.listens_for(Role, 'after_update')
+@event.listens_for(Role, 'before_delete')
+def invalidate_cached_role_users(mapper, connection, target):
+    # Cached auth entries carry role names, drop those of every member of the role
+    user_ids = connection.execute(
+        select(users_roles.c.user_id).where(users_roles.c.role_id == target.id)
+    ).scalars().all()
+    auth_user_cache.invalidate_on_commit(object_session(target), *user_ids)
             
 
 # # class Role(db.Model):
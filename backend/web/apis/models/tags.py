@@ -41,7 +41,8 @@ class Tag(db.Model):
             'id': self.id,
             'name': self.name,
             'description': self.description,
-            'image_urls': [image.file_path.replace('\\', '/') for image in self.images]
+            'image_urls': [image.display_url() for image in self.images],
+            'images': [image.get_summary() for image in self.images],
         }
         if self.products and include_products:
             data['products'] = [ product.get_summary() for product in self.products]
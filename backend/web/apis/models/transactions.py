@@ -1,4 +1,5 @@
 from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
 from web.extensions import db
 
 class Transaction(db.Model):
@@ -87,3 +88,49 @@ class Transaction(db.Model):
             # }
         
         return summary
+
+class WebhookEvent(db.Model):
+    """
+    Inbox of raw payment webhooks. Events are stored as received (once per provider event id)
+    and applied later, in batches, by `process_webhooks.py`.
+    """
+    __tablename__ = 'webhook_events'
+    __table_args__ = (
+        db.UniqueConstraint('provider', 'event_id', name='uq_webhook_events_provider_event_id'),
+        db.Index('ix_webhook_events_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    provider = db.Column(db.String(20), nullable=False)
+    event_id = db.Column(db.String(100), nullable=False)
+    event_type = db.Column(db.String(50), nullable=True)
+    reference = db.Column(db.String(100), nullable=True, index=True)
+    payload = db.Column(db.JSON, nullable=False)
+
+    status = db.Column(db.String(20), nullable=False, index=True, default='pending')  # pending | processed | ignored | failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(255), nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=func.now())  # Pending events are not picked up before this
+
+    received_at = db.Column(db.DateTime, nullable=False, default=func.now())
+    processed_at = db.Column(db.DateTime, nullable=True)
+
+    @staticmethod
+    def record(provider, event_id, event_type, reference, payload):
+        """
+        Store an event unless it was already received.
+
+        Written through its own connection so a duplicate delivery is a cheap unique-key miss.
+
+        Returns:
+            bool: True if the event is new, False for a duplicate.
+        """
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(WebhookEvent.__table__.insert().values(
+                    provider=provider, event_id=event_id, event_type=event_type,
+                    reference=reference, payload=payload, status='pending', attempts=0
+                ))
+            return True
+        except IntegrityError:
+            return False
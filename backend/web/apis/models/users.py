@@ -1,13 +1,15 @@
 from datetime import datetime, timedelta, timezone
 import traceback
-from flask import request
+from flask import current_app, g, request
 from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
 from jwt import ExpiredSignatureError
-from sqlalchemy import func, or_
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import case, event, func, inspect, or_, tuple_
+from sqlalchemy.orm import make_transient_to_detached, object_session
 from web.apis.utils.serializers import error_response
 from web.extensions import db, jwt
 from web.apis.models.roles import users_roles
+from web.apis.utils.cache import auth_user_cache
+from web.apis.utils.passwords import password_hasher
 # from web.apis.models.products import products_users
 from web.apis.models.pages import users_pages
 # from web.apis.models.chats import user_group
@@ -36,7 +38,8 @@ class User(db.Model):
     last_seen = db.Column(db.DateTime, nullable=True)
     online_status = db.Column(db.Boolean, default=False)
     is_deleted = db.Column(db.Boolean(), nullable=False, default=False)
-    created_at = db.Column(db.DateTime, nullable=False, default=func.now())
+    role_version = db.Column(db.Integer, nullable=False, default=0)  # Bumped on role changes, checked against the 'rv' claim
+    created_at = db.Column(db.DateTime, index=True, nullable=False, default=func.now())
     updated_at = db.Column(db.DateTime, nullable=False, default=func.now(), onupdate=func.now())
     
     # comments = db.relationship('Comment', foreign_keys='Comment.user_id', back_populates='user', lazy='dynamic')
@@ -84,20 +87,24 @@ class User(db.Model):
         return user
 
     def set_password(self, password: str) -> None:
-        """Hashes the password using bcrypt/scrypt and stores it."""
+        """Hashes the password (off the request thread, see `password_hasher`) and stores it."""
         if not password:
             raise ValueError("Password cannot be empty")
-        self.password = generate_password_hash(password)
+        self.password = password_hasher().hash(password)
 
     def check_password(self, password: str) -> bool:
-        """Checks the hashed password using bcrypt."""
+        """Checks the password against the stored hash (off the request thread)."""
         if self.password is None:
             # return False
             raise ValueError(f"Password not set for this user [{self.username}].")
-        return check_password_hash(self.password, password)
+        return password_hasher().verify(self.password, password)
+
+    def password_needs_rehash(self) -> bool:
+        """Whether the stored hash uses outdated parameters (see PASSWORD_HASH_METHOD)."""
+        return self.password is not None and password_hasher().needs_rehash(self.password)
 
     def is_admin(self):
-        return 'admin' in [r.name for r in self.roles]
+        return 'admin' in self.get_roles()
 
     def is_not_admin(self):
         return not self.is_admin()
@@ -106,8 +113,37 @@ class User(db.Model):
         return '<User {}>'.format(self.username)
 
     def get_roles(self):
+        # Role names come from the auth cache when the user was loaded by `load_for_auth`
+        role_names = getattr(self, '_role_names', None)
+        if role_names is not None:
+            return list(role_names)
         return [ r.name for r in self.roles ]
 
+    @staticmethod
+    def load_for_auth(user_id):
+        """
+        Load the user behind a JWT by primary key, through the short-TTL auth cache.
+
+        On a hit the user is rebuilt from the cached fields and merged into the session without
+        a query; columns and relationships that were not cached load lazily on first access.
+
+        Returns:
+            User: The user, or None if it does not exist.
+        """
+        data = auth_user_cache.get(user_id)
+        if data is None:
+            user = db.session.get(User, user_id)
+            if user is not None:
+                auth_user_cache.set(user)
+            return user
+
+        role_names = data.pop('roles', [])
+        user = User(**data)
+        make_transient_to_detached(user)
+        user = db.session.merge(user, load=False)
+        user._role_names = role_names
+        return user
+
     # def make_token(self, token_type: str = "verify_email") -> str:
     #     """
     #     Generate a JWT token for the specified token type (e.g., reset_password, verify_email).
@@ -139,6 +175,8 @@ class User(db.Model):
         Generate a JWT token for the specified token type (e.g., access or refresh).
         - The access token expires in 15 minutes.
         - The refresh token expires in 30 days.
+        - Claims are compact: the user id as 'sub', the role bitmask ('rl', see `Role.mask`)
+          with the role version it was taken at ('rv'), the token type and the expiry.
 
         Args:
             token_type (str): The type of token to create ("access" or "refresh").
@@ -147,11 +185,12 @@ class User(db.Model):
             str: The generated JWT token.
         """
         try:
-            # Prepare the additional claims (user summary data)
-            additional_claims = self.get_summary(include_roles=True)
-
-            # Add the token type to the claims
-            additional_claims["token_type"] = token_type
+            # Prepare the additional claims (roles as a bitmask, see Role.mask)
+            additional_claims = {
+                "rl": sum(1 << role.id for role in self.roles),
+                "rv": self.role_version or 0,
+                "token_type": token_type
+            }
 
             # Set expiration based on token type
             if token_type == "access":
@@ -164,15 +203,15 @@ class User(db.Model):
             # Add expiration claim to additional claims
             additional_claims["exp"] = datetime.now(timezone.utc) + expiration_time
 
-            # Use the user's email as the 'sub' claim (subject)
-            additional_claims['sub'] = str(self.email)  # Ensure 'sub' is a string
+            # Use the user's immutable id as the 'sub' claim (subject)
+            additional_claims['sub'] = str(self.id)  # Ensure 'sub' is a string
 
             if token_type == "access":
                 # Create the access token with the provided claims
-                token = create_access_token(identity=str(self.email), additional_claims=additional_claims)
+                token = create_access_token(identity=str(self.id), additional_claims=additional_claims)
             elif token_type == "refresh":
                 # Create the refresh token with a longer expiration time
-                token = create_refresh_token(identity=str(self.email), additional_claims=additional_claims)
+                token = create_refresh_token(identity=str(self.id), additional_claims=additional_claims)
             
             return token
 
@@ -234,12 +273,104 @@ class User(db.Model):
 
         return data
 
+class UserIdentifier(db.Model):
+    """
+    Normalized login identifiers (username, email, phone) of every user, one row each, so a
+    sign-in resolves with one probe of the `value` index and signup/update uniqueness is one
+    query. Rows are kept in sync by the User mapper events below; `backfill_user_identifiers.py`
+    fills the table for existing users.
+    """
+    __tablename__ = 'user_identifiers'
+    __table_args__ = (db.UniqueConstraint('kind', 'value', name='uq_user_identifiers_kind_value'),)
+
+    kinds = ('username', 'email', 'phone')
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    kind = db.Column(db.String(10), nullable=False)
+    value = db.Column(db.String(120), nullable=False, index=True)
+
+    @staticmethod
+    def normalize(value):
+        return str(value).strip().lower()
+
+    @staticmethod
+    def taken(exclude_user_id=None, **values):
+        """
+        Which of the given identifiers (e.g. `username='ada', email='ada@example.com'`) already
+        belong to another user, in one query.
+
+        Returns:
+            list: The taken kinds, in `UserIdentifier.kinds` order.
+        """
+        values = {kind: UserIdentifier.normalize(value) for kind, value in values.items() if value}
+        if not values:
+            return []
+
+        query = db.session.query(UserIdentifier.kind).filter(
+            tuple_(UserIdentifier.kind, UserIdentifier.value).in_(list(values.items()))
+        )
+        if exclude_user_id is not None:
+            query = query.filter(UserIdentifier.user_id != exclude_user_id)
+
+        taken = {kind for kind, in query}
+        return [kind for kind in UserIdentifier.kinds if kind in taken]
+
+    @staticmethod
+    def find_user(identifier):
+        """
+        The user whose username, email or phone is `identifier`, or None.
+
+        When the same value is one user's username and another's email or phone, the username
+        wins, then the email (`UserIdentifier.kinds` order).
+
+        Users without identifier rows are only found with `USER_IDENTIFIERS_FALLBACK`, which
+        repeats the lookup on `users`; turn it off once `backfill_user_identifiers.py` has run.
+        """
+        preference = case({kind: rank for rank, kind in enumerate(UserIdentifier.kinds)}, value=UserIdentifier.kind)
+        user = User.query.join(UserIdentifier, UserIdentifier.user_id == User.id).filter(
+            UserIdentifier.value == UserIdentifier.normalize(identifier)
+        ).order_by(preference).first()
+        if user or not current_app.config.get('USER_IDENTIFIERS_FALLBACK'):
+            return user
+
+        return User.query.filter(
+            or_(User.username == identifier, User.email == identifier, User.phone == identifier)
+        ).first()
+
+    @staticmethod
+    def sync(connection, user, kinds=None):
+        """Rewrite the identifier rows of `user` for `kinds` (all by default) on `connection`."""
+        kinds = kinds or UserIdentifier.kinds
+        table = UserIdentifier.__table__
+        connection.execute(table.delete().where(table.c.user_id == user.id).where(table.c.kind.in_(kinds)))
+
+        rows = [
+            {'user_id': user.id, 'kind': kind, 'value': UserIdentifier.normalize(getattr(user, kind))}
+            for kind in kinds if getattr(user, kind)
+        ]
+        if rows:
+            connection.execute(table.insert(), rows)
+
+@event.listens_for(User, 'after_insert')
+def insert_user_identifiers(mapper, connection, target):
+    UserIdentifier.sync(connection, target)
+
+@event.listens_for(User, 'after_update')
+def update_user_identifiers(mapper, connection, target):
+    state = inspect(target)
+    changed = [kind for kind in UserIdentifier.kinds if state.attrs[kind].history.has_changes()]
+    if changed:
+        UserIdentifier.sync(connection, target, changed)
+
 from web.apis.utils.chats import connection_manager
 
 # Register a callback function that takes whatever object is passed in as the
 # identity when creating JWTs and converts it to a JSON serializable format.
 @jwt.user_identity_loader
 def user_identity_lookup(user):
+    if isinstance(user, (str, int)):
+        return str(user)
     try:
         user = user.get('email', user['id'])
         return user.get('email', user)
@@ -252,20 +383,39 @@ def user_identity_lookup(user):
 # if the user has been deleted from the database).
 @jwt.user_lookup_loader
 def user_lookup_callback(_jwt_header, jwt_data):
-    identity = jwt_data["sub"]
-    # return User.query.filter_by(or_(email=identity, id=identity)).one_or_none()
-    return User.query.filter(
-        or_(User.email == identity, User.id == identity)
-    ).one_or_none()
-
-# Callback function to check if a JWT exists in the database blocklist
-from web.extensions import redis as r
+    # Compact tokens carry the user id as subject, older ones the email plus an 'id' claim
+    user_id = int(jwt_data["sub"]) if "rl" in jwt_data else jwt_data.get("id")
+    if user_id is None:
+        # Tokens without the immutable id claim: exact match on the unique email
+        return User.query.filter_by(email=jwt_data["sub"]).one_or_none()
+
+    # Memoized for the request, several decorators may verify the same token
+    users = g.setdefault('_auth_users', {})
+    if user_id not in users:
+        users[user_id] = User.load_for_auth(user_id)
+    return users[user_id]
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_auth_user(mapper, connection, target):
+    auth_user_cache.invalidate_on_commit(object_session(target), target.id)
+
+@event.listens_for(User.roles, 'append')
+@event.listens_for(User.roles, 'remove')
+def invalidate_cached_auth_roles(target, value, initiator):
+    # Tokens issued before this change no longer match and fall back to the database
+    target.role_version = (target.role_version or 0) + 1
+    target._role_names = None
+    auth_user_cache.invalidate_on_commit(object_session(target), target.id)
+
+# Callback function to check if a JWT has been revoked (signed out)
+from web.apis.utils.revocation import revocation_store
 @jwt.token_in_blocklist_loader
 def check_if_token_revoked(jwt_header, jwt_payload: dict) -> bool:
     jti = jwt_payload["jti"]
     # token = db.session.query(TokenBlocklist.id).filter_by(jti=jti).scalar() // db-way-of-doing-it
     # return token is not None  // db-way-of-doing-it
-    return r.sismember("blacklist", jti) #  // redis-way-of-doing-it
+    return revocation_store.is_revoked(jti)
 
 # 
 # Custom error response for missing token
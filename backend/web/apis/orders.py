@@ -1,14 +1,15 @@
 import traceback
 from flask import request
 from flask_jwt_extended import jwt_required, get_jwt, current_user
-from jsonschema import ValidationError, validate
+from jsonschema import ValidationError
+from web.apis.utils.validators import validate
 from sqlalchemy import desc
 from web.apis.models.addresses import Address
 from web.apis.utils.decorators import access_required
 from web.extensions import db, fake
 from web.apis.models.orders import Order, OrderItem
 from web.apis.schemas.order import order_schema
-from web.apis.utils.serializers import PageSerializer
+from web.apis.utils.serializers import InvalidCursor, PageSerializer, paginate
 from web.apis.models.products import Product
 from web.apis.utils.serializers import success_response, error_response
 
@@ -20,13 +21,14 @@ from web.apis import api_bp as order_bp
 def orders():
     try:
         # Check permissions
-        page_size = request.args.get('page_size', 5)
-        page = request.args.get('page', 1)
-        orders = Order.query.order_by(desc(Order.created_at)).paginate(page=page, per_page=page_size)
+        orders = paginate(Order.query.order_by(desc(Order.created_at)), Order)
         data = PageSerializer(pagination_obj=orders, resource_name="orders", include_users=True).get_data()
         
         return success_response("Orders fetched successfully", data=data)
     
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         db.session.rollback()  # Rollback in case of error
         traceback.print_exc()
@@ -40,18 +42,18 @@ def my_orders(user_id):
         if not current_user.is_admin() and user_id != current_user.id:
             return error_response("Permission denied.", status_code=403)
         
-        page_size = request.args.get('page_size', 5)
-        page = request.args.get('page', 1)
-        
-        orders = Order.query.filter_by(
+        orders = paginate(Order.query.filter_by(
             user_id=user_id).order_by(
             desc(Order.created_at)
-            ).paginate(page=page, per_page=page_size)
+            ), Order)
         
         data = PageSerializer(pagination_obj=orders,  resource_name="orders", include_users=True).get_data()
         
         return success_response("Orders fetched successfully", data=data)
     
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         db.session.rollback()  # Rollback in case of error
         traceback.print_exc()
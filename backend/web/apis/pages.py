@@ -6,7 +6,8 @@ import re
 import traceback
 from flask import request
 from flask_jwt_extended import jwt_required, current_user
-from jsonschema import ValidationError, validate
+from jsonschema import ValidationError
+from web.apis.utils.validators import validate
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import desc, exc
 from werkzeug.utils import secure_filename
@@ -17,9 +18,10 @@ from web.apis.models.pages import Page
 from web.apis.models.tags import Tag
 from web.apis.models.file_uploads import ProductImage
 from web.apis.schemas.pages import page_schema, page_update_schema
+from web.apis.utils.cache import summary_cache
 from web.apis.utils.get_or_create import get_or_create
 from web.apis.utils.helpers import validate_file_upload
-from web.apis.utils.serializers import PageSerializer, error_response, success_response
+from web.apis.utils.serializers import InvalidCursor, PageSerializer, error_response, paginate, success_response
 from web.apis import api_bp as pages_bp
 
 @pages_bp.route('/pages', methods=['GET'])
@@ -34,17 +36,17 @@ def get_pages():
     :return: JSON response with paginated page data.
     """
     try:
-        page = request.args.get('page', 1, type=int)  # Ensure 'page' is an integer
-        page_size = request.args.get('page_size', 5, type=int)  # Ensure 'page_size' is an integer
-
         # Fetch pages with pagination
-        pages = Page.query.order_by(desc(Page.created_at)).paginate(page=page, per_page=page_size)
+        pages = paginate(Page.query.order_by(desc(Page.created_at)), Page)
         if pages:
             # Serialize the paginated result using PageSerializer
             data = PageSerializer(pagination_obj=pages, resource_name="pages").get_data()
             return success_response("Pages fetched successfully.", data=data)
         
         return success_response('No pages found.', {'pages': []}, status_code=200)
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         return error_response(f"An error occurred: {str(e)}", status_code=500)
 
@@ -58,8 +60,10 @@ def get_page_by_id(page_id):
     :return: JSON response with page data or error message.
     """
     try:
-        page = Page.query.get_or_404(page_id)
-        return success_response("Page fetched successfully", data=page.get_summary())
+        data = Page.get_cached_summary(page_id)
+        if not data:
+            return error_response(f"Page <{page_id}> not found.", status_code=404)
+        return success_response("Page fetched successfully", data=data)
     except Exception as e:
         return error_response(f"An error occurred: {str(e)}", status_code=500)
 
@@ -73,10 +77,10 @@ def get_page_by_slug(page_slug):
     :return: JSON response with page data or error message.
     """
     try:
-        page = Page.query.filter_by(slug=page_slug).first()
-        if not page:
+        data = Page.get_cached_summary(page_slug)
+        if not data:
             return error_response(f"Page <{page_slug}> not found.", status_code=404)
-        return success_response("Page fetched successfully.", data=page.get_summary())
+        return success_response("Page fetched successfully.", data=data)
     except Exception as e:
         traceback.print_exc()
         return error_response(f"An error occurred: {str(e)}", status_code=500)
@@ -96,17 +100,17 @@ def get_pages_by_user(user_id):
         if not user:
             return error_response("User not found.", status_code=404)
 
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 5, type=int)
-
         # Fetch pages associated with the user
-        pages = Page.query.filter(Page.users.any(id=user_id)).order_by(desc(Page.created_at)).paginate(page=page, per_page=page_size)
+        pages = paginate(Page.query.filter(Page.users.any(id=user_id)).order_by(desc(Page.created_at)), Page)
 
         # Serialize the paginated result using PageSerializer
         data = PageSerializer(pagination_obj=pages, resource_name="pages", context_id=user_id, include_user=True).get_data()
 
         return success_response("Pages fetched successfully.", data=data)
 
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         traceback.print_exc()
         return error_response(f"An error occurred: {str(e)}", status_code=500)
@@ -121,17 +125,17 @@ def get_associated_pages(page_id):
     :return: JSON response with paginated page data for the page.
     """
     try:
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 5, type=int)
-
         # Fetch pages associated with the page
-        pages = Page.query.filter(Page.pages.any(id=page_id)).order_by(desc(Page.created_at)).paginate(page=page, per_page=page_size)
+        pages = paginate(Page.query.filter(Page.pages.any(id=page_id)).order_by(desc(Page.created_at)), Page)
 
         # Serialize the paginated result using PageSerializer
         data = PageSerializer(pagination_obj=pages, resource_name="pages", context_id=page_id, include_user=True, include_page=True).get_data()
 
         return success_response("Pages fetched successfully.", data=data)
 
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         traceback.print_exc()
         return error_response(f"An error occurred: {str(e)}", status_code=500)
@@ -150,17 +154,17 @@ def get_pages_by_category(category_id):
         if not category:
             return error_response("Category not found.", status_code=404)
 
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 5, type=int)
-
         # Fetch pages associated with the category
-        pages = Page.query.filter(Page.categories.any(id=category_id)).order_by(desc(Page.created_at)).paginate(page=page, per_page=page_size)
+        pages = paginate(Page.query.filter(Page.categories.any(id=category_id)).order_by(desc(Page.created_at)), Page)
 
         # Serialize the paginated result using PageSerializer
         data = PageSerializer(pagination_obj=pages, resource_name="pages", context_id=category_id).get_data()
 
         return success_response("Pages fetched successfully.", data=data)
 
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         traceback.print_exc()
         return error_response(f"An error occurred: {str(e)}", status_code=500)
@@ -334,6 +338,8 @@ def update_page(page_slug):
         if page is None:
             return error_response(f'Page not found <{data.get("name", page_slug)}>', status_code=404)
 
+        old_slug = page.slug
+
         # Update page attributes with provided data
         page.name = data.get('name', page.name)
         page.username = data.get('username', page.username)
@@ -405,6 +411,9 @@ def update_page(page_slug):
         # Commit the changes to the database
         db.session.commit()
 
+        # Also dropped by the model's `after_update` hook, repeated post-commit so a concurrent read can't re-cache stale data
+        summary_cache.invalidate('page', page.id, old_slug, page.slug)
+
         # Prepare and return the response
         data = page.get_summary()
         return success_response("Page updated successfully", data=data)
@@ -440,8 +449,10 @@ def delete_page(identifier):
             return error_response(f'Page not found <{identifier}>', status_code=404)
 
         # Delete the page and commit the transaction
+        page_id, page_slug = page.id, page.slug
         db.session.delete(page)
         db.session.commit()
+        summary_cache.invalidate('page', page_id, page_slug)
         return success_response('Page deleted successfully')
     
     except Exception as e:
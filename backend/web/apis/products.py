@@ -3,21 +3,24 @@ import re
 import traceback
 from flask import request
 from flask_jwt_extended import jwt_required, current_user
-from jsonschema import ValidationError, validate
+from jsonschema import ValidationError
+from web.apis.utils.validators import validate
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import desc, exc
 from werkzeug.utils import secure_filename
-from web.apis.utils.uploader import uploader
+from web.apis.utils.uploader import upload_many
 from web.extensions import db
-from web.apis.models.categories import Category
+from web.apis.models.categories import Category, products_categories
 from web.apis.models.pages import Page
 from web.apis.models.tags import Tag
 from web.apis.models.file_uploads import ProductImage
 from web.apis.models.products import Product
 from web.apis.schemas.product import product_schema
+from web.apis.utils.cache import summary_cache
 from web.apis.utils.get_or_create import get_or_create
 from web.apis.utils.helpers import validate_file_upload
-from web.apis.utils.serializers import PageSerializer, error_response, success_response
+from web.apis.utils.images import queue_renditions
+from web.apis.utils.serializers import InvalidCursor, PageSerializer, error_response, paginate, success_response
 from web.apis import api_bp as product_bp
 
 @product_bp.route('/products', methods=['GET'])
@@ -27,23 +30,23 @@ def products():
     Retrieve a paginated list of products.
 
     Returns a list of products, paginated by the specified page and page size.
-    If no products are found, an empty list is returned.
+    If no products are found, an empty list is returned. Pass `?cursor=` (empty for the
+    first page, then `next_cursor`) for keyset pagination and `?with_total=1` to count.
 
     :return: JSON response with paginated product data.
     """
     try:
-        # Pagination parameters: Default page = 1, page_size = 5
-        page = request.args.get('page', 1, type=int)  # Ensure 'page' is an integer
-        page_size = request.args.get('page_size', 5, type=int)  # Ensure 'page_size' is an integer
-
         # Fetch products with pagination
-        products = Product.query.order_by(desc(Product.created_at)).paginate(page=page, per_page=page_size)
+        products = paginate(Product.query.order_by(desc(Product.created_at)), Product)
 
         # Serialize the paginated result using PageSerializer
         data = PageSerializer(pagination_obj=products, resource_name="products").get_data()
         
         return success_response("Products fetched successfully.", data=data)
 
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         
         # Handle any unexpected errors
@@ -59,8 +62,10 @@ def by_id(product_id):
     :return: JSON response with product data or error message.
     """
     try:
-        product = Product.query.get_or_404(product_id)
-        return success_response("Product fetched successfully", data=product.get_summary())
+        data = Product.get_cached_summary(product_id)
+        if not data:
+            return error_response(f"Product <{product_id}> not found.", status_code=404)
+        return success_response("Product fetched successfully", data=data)
     except Exception as e:
         return error_response(f"An error occurred: {str(e)}", status_code=500)
 
@@ -74,10 +79,10 @@ def by_slug(product_slug):
     :return: JSON response with product data or error message.
     """
     try:
-        product = Product.query.filter_by(slug=product_slug).first()
-        if not product:
+        data = Product.get_cached_summary(product_slug)
+        if not data:
             return error_response(f"Product <{product_slug}> not found.", status_code=404)
-        return success_response("Product fetched successfully.", data=product.get_summary())
+        return success_response("Product fetched successfully.", data=data)
     except Exception as e:
         traceback.print_exc()
         return error_response(f"An error occurred: {str(e)}", status_code=500)
@@ -97,18 +102,17 @@ def by_user(user_id):
         if not user:
             return error_response("User not found.", status_code=404)
 
-        # Pagination parameters: Default page = 1, page_size = 5
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 5, type=int)
-
         # Fetch products associated with the user
-        products = Product.query.filter(Product.users.any(id=user_id)).order_by(desc(Product.created_at)).paginate(page=page, per_page=page_size)
+        products = paginate(Product.query.filter(Product.users.any(id=user_id)).order_by(desc(Product.created_at)), Product)
 
         # Serialize the paginated result using PageSerializer
         data = PageSerializer(pagination_obj=products, resource_name="products", context_id=user_id, include_user=True).get_data()
 
         return success_response("Products fetched successfully.", data=data)
 
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         traceback.print_exc()
         return error_response(f"An error occurred: {str(e)}", status_code=500)
@@ -123,18 +127,17 @@ def by_page(page_id):
     :return: JSON response with paginated product data for the page.
     """
     try:
-        # Pagination parameters: Default page = 1, page_size = 5
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 5, type=int)
-
         # Fetch products associated with the page
-        products = Product.query.filter(Product.pages.any(id=page_id)).order_by(desc(Product.created_at)).paginate(page=page, per_page=page_size)
+        products = paginate(Product.query.filter(Product.pages.any(id=page_id)).order_by(desc(Product.created_at)), Product)
 
         # Serialize the paginated result using PageSerializer
         data = PageSerializer(pagination_obj=products, resource_name="products", context_id=page_id, include_user=True, include_page=True).get_data()
 
         return success_response("Products fetched successfully.", data=data)
 
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         traceback.print_exc()
         return error_response(f"An error occurred: {str(e)}", status_code=500)
@@ -145,6 +148,9 @@ def by_category(category_id):
     """
     Fetch products associated with a specific category.
 
+    With `?include_descendants=1` products linked to any category in the subtree are listed too.
+    The subtree is resolved inside the same statement (materialized path range scan), never per child.
+
     :param category_id: The ID of the category to filter products.
     :return: JSON response with paginated product data for the category.
     """
@@ -153,18 +159,29 @@ def by_category(category_id):
         if not category:
             return error_response("Category not found.", status_code=404)
 
-        # Pagination parameters: Default page = 1, page_size = 5
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 5, type=int)
+        include_descendants = request.args.get('include_descendants', '0').lower() in ('1', 'true', 'yes')
+
+        if include_descendants:
+            # A product linked to several categories of the subtree must only be listed once
+            query = Product.query.join(
+                products_categories, products_categories.c.product_id == Product.id
+            ).filter(
+                products_categories.c.category_id.in_(Category.subtree_select(category_id))
+            ).distinct().order_by(desc(Product.created_at), desc(Product.id))
+        else:
+            query = Product.query.filter(Product.categories.any(id=category_id)).order_by(desc(Product.created_at))
 
         # Fetch products associated with the category
-        products = Product.query.filter(Product.categories.any(id=category_id)).order_by(desc(Product.created_at)).paginate(page=page, per_page=page_size)
+        products = paginate(query, Product)
 
         # Serialize the paginated result using PageSerializer
         data = PageSerializer(pagination_obj=products, resource_name="products", context_id=category_id).get_data()
 
         return success_response("Products fetched successfully.", data=data)
 
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         traceback.print_exc()
         return error_response(f"An error occurred: {str(e)}", status_code=500)
@@ -257,25 +274,26 @@ def create():
             dir_path = os.getenv('IMAGES_LOCATION')
             dir_path = os.path.join(dir_path, 'products')
 
-            for image in request.files.getlist('images[]'):
-                if image and validate_file_upload(image.filename):
-                    file_name = secure_filename(image.filename)
-                    file_path = uploader(image, upload_dir=dir_path)
-                    file_size = image.content_length or os.stat(file_path).st_size
-
-                    product_image = ProductImage(
-                        file_path=file_path, 
-                        file_name=file_name,
-                        original_name=image.filename, 
-                        file_size=file_size
-                    )
-                    
-                    product.images.append(product_image)
+            images = [image for image in request.files.getlist('images[]') if image and validate_file_upload(image.filename)]
+
+            # Stored concurrently, results come back in upload order
+            for image, (file_path, file_size) in zip(images, upload_many(images, upload_dir=dir_path)):
+                product_image = ProductImage(
+                    file_path=file_path, 
+                    file_name=secure_filename(image.filename),
+                    original_name=image.filename, 
+                    file_size=file_size
+                )
+                
+                product.images.append(product_image)
 
         # Save the product to the database
         db.session.add(product)
         db.session.commit()
 
+        # Renditions are rendered in the background, images are returned as `pending` until then
+        queue_renditions(product.images)
+
         data = product.get_summary()
         return success_response('Product created successfully', data=data)
     
@@ -358,6 +376,9 @@ def update(product_slug):
         product.categories = categories
         db.session.commit()
 
+        # Also dropped by the model's `after_update` hook, repeated post-commit so a concurrent read can't re-cache stale data
+        summary_cache.invalidate('product', product.id, product_slug, product.slug)
+
         data = product.get_summary()
         return success_response("Product updated successfully", data=data)
     
@@ -391,8 +412,10 @@ def destroy(identifier):
             return error_response(f'Product not found <{identifier}>', status_code=404)
 
         # Delete the product and commit the transaction
+        product_id, product_slug = product.id, product.slug
         db.session.delete(product)
         db.session.commit()
+        summary_cache.invalidate('product', product_id, product_slug)
         return success_response('Product deleted successfully')
     
     except Exception as e:
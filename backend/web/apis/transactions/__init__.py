@@ -41,8 +41,10 @@ def save_transaction(
 
 from . import flutterwave
 from . import paystack
+from . import webhooks
 
 __all__ = [
     "flutterwave",
-    "paystack"
+    "paystack",
+    "webhooks"
 ]
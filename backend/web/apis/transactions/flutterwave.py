@@ -1,14 +1,16 @@
 from flask_jwt_extended import current_user, jwt_required
-import traceback, requests, secrets
+import traceback, secrets
 from flask import current_app, request, url_for
 from web.apis.utils.serializers import error_response, success_response
 from web.apis.models.transactions import Transaction
 from requests.exceptions import ConnectionError, Timeout, RequestException
-from jsonschema import validate, ValidationError
+from jsonschema import ValidationError
+from web.apis.utils.validators import validate
 from web.apis.schemas.transactions import pay_schema
 from web.extensions import db, csrf
 from web.apis.models.users import User
 from web.apis.models.orders import Order
+from web.apis.utils.gateways import gateway
 from web.apis.utils.helpers import generate_ref
 from web.apis.transactions import save_transaction, transact_bp
 
@@ -58,7 +60,7 @@ def initiate_flutterwave():
                 "Content-Type": "application/json"
             }
             
-            payment_url = str("https://api.flutterwave.com/v3/payments")
+            payment_url = "/v3/payments"
             refference = str(generate_ref(prefix="TEC", num_digits=4, letters="???"))
             redirect_url = str(request.url_root+"api/transactions/callback/flutterwave")
             # redirect_url = f"{request.url_root}api/transaction/callback/flutterwave"
@@ -81,7 +83,7 @@ def initiate_flutterwave():
             }
 
             try:
-                payment_response = requests.post(payment_url, json=payload, headers=headers)
+                payment_response = gateway('flutterwave').post(payment_url, json=payload, headers=headers)
                 payment_data = dict(payment_response.json()) if payment_response else {}
                 payment_link = payment_data.get("data", {}).get("link")
                 if not payment_link:
@@ -152,8 +154,8 @@ def callback():
                 "Content-Type": "application/json"
             }
 
-            verify_endpoint = f"https://api.flutterwave.com/v3/transactions/{transaction_id}/verify"
-            response = requests.get(verify_endpoint, headers=headers)
+            verify_endpoint = f"/v3/transactions/{transaction_id}/verify"
+            response = gateway('flutterwave').get(verify_endpoint, headers=headers)
 
             if response.status_code == 200:
                 response_data = response.json().get('data', {})
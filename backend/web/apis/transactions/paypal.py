@@ -1,15 +1,17 @@
 from flask_jwt_extended import current_user, jwt_required
-import traceback, requests, secrets
+import traceback, secrets
 from flask import current_app, request, Blueprint, url_for
 from web.apis.utils.serializers import error_response, success_response
 from web.apis.models.transactions import Transaction
 from sqlalchemy.exc import IntegrityError
 from requests.exceptions import ConnectionError, Timeout, RequestException
-from jsonschema import validate, ValidationError
+from jsonschema import ValidationError
+from web.apis.utils.validators import validate
 from web.apis.schemas.transactions import pay_schema
 from web.extensions import db, csrf
 from web.apis.models.users import User
 from web.apis.models.orders import Order
+from web.apis.utils.gateways import gateway
 from web.apis.utils.helpers import generate_ref
 
 pay = Blueprint('pay', __name__)
@@ -57,7 +59,7 @@ def initiate(order_id):
                 "Authorization": f"Bearer {current_app.config['FLUTTERWAVE_SK']}",
                 "Content-Type": "application/json"
             }
-            payment_url = "https://api.flutterwave.com/v3/payments"
+            payment_url = "/v3/payments"
             payload = {
                 "tx_ref": generate_ref(prefix="TEC", num_digits=4, letters="???"),
                 "amount": int(amount),
@@ -79,7 +81,7 @@ def initiate(order_id):
 
             try:
 
-                payment_response = requests.post(payment_url, json=payload, headers=headers)
+                payment_response = gateway('flutterwave').post(payment_url, json=payload, headers=headers)
                 payment_data = dict(payment_response.json()) if payment_response else {}
                 payment_link = payment_data.get("data", {}).get("link")
                 
@@ -172,12 +174,11 @@ def callback():
                 "Content-Type": "application/json"
             }
 
-            verify_endpoint = f"https://api.flutterwave.com/v3/transactions/{transaction_id}/verify"
+            verify_endpoint = f"/v3/transactions/{transaction_id}/verify"
             # response = requests.get(verify_endpoint, headers=headers)
             # response = requests.request("POST", url, headers=headers, data=payload)
-            response = requests.request("POST", verify_endpoint, headers=headers)
             # rresponse = requests.post(verify_endpoint, json=payload, headers=headers)
-            response = requests.post(verify_endpoint, headers=headers)
+            response = gateway('flutterwave').post(verify_endpoint, headers=headers)
 
             if response.status_code == 200:
                 response_data = response.json().get('data', {})
@@ -1,14 +1,16 @@
 from flask_jwt_extended import current_user, jwt_required
-import traceback, requests, secrets
+import traceback, secrets
 from flask import current_app, request, url_for
 from web.apis.utils.serializers import error_response, success_response
 from web.apis.models.transactions import Transaction
 from requests.exceptions import ConnectionError, Timeout, RequestException
-from jsonschema import validate, ValidationError
+from jsonschema import ValidationError
+from web.apis.utils.validators import validate
 from web.apis.schemas.transactions import pay_schema
 from web.extensions import db, csrf
 from web.apis.models.users import User
 from web.apis.models.orders import Order
+from web.apis.utils.gateways import gateway
 from web.apis.utils.helpers import generate_ref
 from web.apis.transactions import save_transaction, transact_bp
 
@@ -55,7 +57,7 @@ def initiate_paystack():
                 "Content-Type": "application/json"
             }
             
-            payment_url = str("https://api.paystack.co/transaction/initialize")
+            payment_url = "/transaction/initialize"
             refference = str(generate_ref(prefix="TEC", num_digits=4, letters="???"))
             redirect_url = str(request.url_root + "api/transactions/callback/paystack")
             payload = {
@@ -63,6 +65,7 @@ def initiate_paystack():
                 "amount": int(amount) * 100,  # Paystack expects amount in kobo
                 "currency": 'NGN',
                 "callback_url": redirect_url,
+                "reference": refference,  # Lets the transaction be verified by our reference later
                 "metadata": {
                     "order_id": order.id,
                     "tx_ref": refference
@@ -70,7 +73,7 @@ def initiate_paystack():
             }
 
             try:
-                payment_response = requests.post(payment_url, json=payload, headers=headers)
+                payment_response = gateway('paystack').post(payment_url, json=payload, headers=headers)
                 payment_data = payment_response.json() if payment_response else {}
                 payment_link = payment_data.get("data", {}).get("authorization_url")
                 
@@ -140,8 +143,8 @@ def callback_paystack():
             "Content-Type": "application/json"
         }
 
-        verify_endpoint = f"https://api.paystack.co/transaction/verify/{transaction_id}"
-        response = requests.get(verify_endpoint, headers=headers)
+        verify_endpoint = f"/transaction/verify/{transaction_id}"
+        response = gateway('paystack').get(verify_endpoint, headers=headers)
 
         if response.status_code == 200:
             response_data = response.json().get('data', {})
@@ -0,0 +1,155 @@
+import threading
+import time
+import traceback
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, update
+from web.apis.models.transactions import Transaction
+from web.apis.utils.gateways import gateway
+from web.extensions import db
+
+def verify_paystack(client, secret, transaction):
+    """Status of a Paystack transaction looked up by its reference, or None while it is still open."""
+    response = client.get(f"/transaction/verify/{transaction.refference}", headers={"Authorization": f"Bearer {secret}"})
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+    data = response.json().get('data') or {}
+    if data.get('status') == 'success':
+        if (data.get('amount') or 0) >= transaction.amount * 100 and data.get('currency') == transaction.currency:
+            return 'success'
+        return 'mismatch'
+    if data.get('status') in ('failed', 'reversed'):
+        return 'failed'
+    if data.get('status') == 'abandoned':
+        return 'abandoned'
+    return None
+
+def verify_flutterwave(client, secret, transaction):
+    """Status of a Flutterwave transaction looked up by its tx_ref, or None while it is still open."""
+    response = client.get(
+        "/v3/transactions/verify_by_reference",
+        params={'tx_ref': transaction.refference},
+        headers={"Authorization": f"Bearer {secret}"}
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+    data = response.json().get('data') or {}
+    if data.get('status') == 'successful':
+        if (data.get('amount') or 0) >= transaction.amount and data.get('currency') == transaction.currency:
+            return 'successful'
+        return 'mismatch'
+    if data.get('status') == 'failed':
+        return 'failed'
+    return None
+
+# payment_method -> (verify function, config key of the secret key)
+verifiers = {
+    'paystack': (verify_paystack, 'PAYSTACK_SK'),
+    'flutterwave': (verify_flutterwave, 'FLUTTERWAVE_SK'),
+}
+
+def pending_transactions(batch_size, min_age_minutes, providers):
+    """
+    Yield lists of pending transactions (id, refference, amount, currency, payment_method),
+    streamed by keyset pagination on the primary key so each batch is one indexed range scan.
+    Transactions younger than `min_age_minutes` are left alone, the shopper may still be paying.
+    """
+    table = Transaction.__table__
+    cutoff = datetime.now() - timedelta(minutes=min_age_minutes)
+    last_id = 0
+    while True:
+        batch = db.session.execute(
+            select(table.c.id, table.c.refference, table.c.amount, table.c.currency, table.c.payment_method)
+            .where(table.c.status == 'pending')
+            .where(table.c.is_deleted.is_(False))
+            .where(table.c.payment_method.in_(providers))
+            .where(table.c.created_at < cutoff)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+def apply_statuses(results):
+    """Write the new statuses with one UPDATE per status; rows changed meanwhile (e.g. by a webhook) are skipped."""
+    by_status = defaultdict(list)
+    for transaction_id, status in results:
+        by_status[status].append(transaction_id)
+
+    updated = 0
+    for status, ids in by_status.items():
+        updated += db.session.execute(
+            update(Transaction)
+            .where(Transaction.id.in_(ids))
+            .where(Transaction.status == 'pending')
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    db.session.commit()
+    return updated
+
+def reconcile_transactions(batch_size=200, concurrency=8, min_age_minutes=30, providers=None):
+    """
+    Re-verify pending transactions against their provider and record the final statuses.
+
+    Each batch is verified on a thread pool, with at most `concurrency` calls in flight per
+    provider, then written back with bulk UPDATEs. Only final outcomes are written: successful
+    payments get the provider's success status, declined ones 'failed', abandoned checkouts
+    'abandoned', and paid amounts or currencies that do not match the transaction 'mismatch'.
+
+    Returns:
+        dict: outcome counts plus 'checked', 'updated', 'errors', 'seconds' and 'per_second'.
+    """
+    providers = list(providers or verifiers)
+    config = current_app.config
+    # Clients and secrets are resolved here, the worker threads run outside the app context
+    clients = {name: (gateway(name), config.get(verifiers[name][1])) for name in providers}
+    slots = {name: threading.BoundedSemaphore(concurrency) for name in providers}
+
+    def verify(transaction):
+        verify_function = verifiers[transaction.payment_method][0]
+        client, secret = clients[transaction.payment_method]
+        with slots[transaction.payment_method]:
+            try:
+                return transaction.id, verify_function(client, secret, transaction), None
+            except Exception as e:
+                return transaction.id, None, f"{transaction.payment_method} {transaction.refference}: {e}"
+
+    report = Counter()
+    errors = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency * len(providers), thread_name_prefix='reconcile') as pool:
+        for batch in pending_transactions(batch_size, min_age_minutes, providers):
+            results = []
+            for transaction_id, status, error in pool.map(verify, batch):
+                report['checked'] += 1
+                if error:
+                    errors.append(error)
+                    report['errors'] += 1
+                elif status:
+                    results.append((transaction_id, status))
+                    report[status] += 1
+                else:
+                    report['still_pending'] += 1
+
+            try:
+                report['updated'] += apply_statuses(results)
+            except Exception:
+                db.session.rollback()
+                traceback.print_exc()
+                report['errors'] += len(results)
+
+    report['seconds'] = round(time.perf_counter() - started, 2)
+    report['per_second'] = round(report['checked'] / report['seconds'], 1) if report['seconds'] else 0.0
+    for error in errors[:20]:
+        current_app.logger.warning("Reconciliation failed for %s", error)
+    return dict(report)
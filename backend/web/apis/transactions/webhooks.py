@@ -0,0 +1,167 @@
+import hashlib
+import hmac
+import traceback
+from datetime import datetime, timedelta
+from flask import current_app, request
+from sqlalchemy import func
+from web.apis.utils.serializers import error_response, success_response
+from web.apis.models.transactions import Transaction, WebhookEvent
+from web.extensions import db, csrf, limiter
+from web.apis.transactions import transact_bp
+
+def verify_paystack(body, headers):
+    """Paystack signs the raw body with HMAC-SHA512 of the secret key (`x-paystack-signature`)."""
+    secret = current_app.config.get('PAYSTACK_SK') or ''
+    expected = hmac.new(secret.encode('utf-8'), body, hashlib.sha512).hexdigest()
+    return bool(secret) and hmac.compare_digest(expected, headers.get('x-paystack-signature', ''))
+
+def verify_flutterwave(body, headers):
+    """Flutterwave sends the secret hash set on the dashboard in `verif-hash`."""
+    secret = current_app.config.get('FLUTTERWAVE_WEBHOOK_HASH') or ''
+    return bool(secret) and hmac.compare_digest(secret, headers.get('verif-hash', ''))
+
+# provider -> (signature check, payload -> (event id, event type, transaction reference))
+providers = {
+    'paystack': (
+        verify_paystack,
+        lambda event: (
+            f"{event.get('event')}:{event['data']['id']}",
+            event.get('event'),
+            (event['data'].get('metadata') or {}).get('tx_ref') or event['data'].get('reference'),
+        ),
+    ),
+    'flutterwave': (
+        verify_flutterwave,
+        lambda event: (
+            f"{event.get('event')}:{event['data']['id']}",
+            event.get('event'),
+            event['data'].get('tx_ref'),
+        ),
+    ),
+}
+
+@transact_bp.route('/transactions/webhooks/<string:provider>', methods=['POST'])
+@csrf.exempt
+@limiter.exempt
+def receive_webhook(provider):
+    """
+    Payment webhook: check the signature, store the raw event in the inbox and acknowledge.
+    Nothing else happens in the request; `process_webhooks.py` applies the events.
+
+    Redeliveries of an event already stored are acknowledged without being stored again.
+    """
+    try:
+        if provider not in providers:
+            return error_response(f"Unknown provider <{provider}>.", status_code=404)
+
+        verify, identify = providers[provider]
+        body = request.get_data(cache=False)
+        if not verify(body, request.headers):
+            return error_response("Invalid signature.", status_code=401)
+
+        event = current_app.json.loads(body)
+        try:
+            event_id, event_type, reference = identify(event)
+        except (KeyError, TypeError):
+            return error_response("Malformed event.", status_code=400)
+
+        created = WebhookEvent.record(provider, event_id, event_type, reference, event)
+        return success_response("Event received." if created else "Event already received.")
+
+    except Exception as e:
+        traceback.print_exc()
+        return error_response(f"error: {str(e)}", status_code=500)
+
+def paystack_status(event, transaction):
+    """New status of `transaction` for a Paystack event, or None if the event does not settle it."""
+    data = event['data']
+    if (
+        event.get('event') == 'charge.success'
+        and data.get('status') == 'success'
+        and (data.get('amount') or 0) >= transaction.amount * 100  # Amount in kobo
+        and data.get('currency') == transaction.currency
+    ):
+        return 'success'
+    return None
+
+def flutterwave_status(event, transaction):
+    """New status of `transaction` for a Flutterwave event, or None if the event does not settle it."""
+    data = event['data']
+    if (
+        event.get('event') == 'charge.completed'
+        and data.get('status') == 'successful'
+        and (data.get('amount') or 0) >= transaction.amount
+        and data.get('currency') == transaction.currency
+    ):
+        return 'successful'
+    return None
+
+status_rules = {'paystack': paystack_status, 'flutterwave': flutterwave_status}
+
+def retry_later(event, max_attempts, retry_backoff, error):
+    """Leave `event` pending until its next attempt is due (`retry_backoff * 2 ** (attempts - 1)` seconds), or fail it."""
+    event.error = error
+    if event.attempts >= max_attempts:
+        event.status = 'failed'
+        return
+    event.status = 'pending'
+    event.next_attempt_at = datetime.now() + timedelta(seconds=retry_backoff * 2 ** (event.attempts - 1))
+
+def process_webhook_events(batch_size=100, max_attempts=5, retry_backoff=30):
+    """
+    Apply one batch of due inbox events to their transactions and commit once.
+
+    Rows are claimed with `SELECT ... FOR UPDATE SKIP LOCKED`, so several processors can run side
+    by side, and all transactions of the batch are loaded with one IN query.
+
+    Events whose transaction is not found yet (a webhook can beat the checkout commit) stay
+    pending and are retried with an exponential backoff, up to `max_attempts`. Events are taken
+    in `next_attempt_at` order, so retries wait their turn behind newer events.
+
+    Returns:
+        int: the number of events settled (processed, ignored or failed); 0 when nothing but
+        retries was left.
+    """
+    events = (
+        WebhookEvent.query
+        .filter(WebhookEvent.status == 'pending')
+        .filter(WebhookEvent.next_attempt_at <= datetime.now())
+        .order_by(WebhookEvent.next_attempt_at, WebhookEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not events:
+        db.session.commit()
+        return 0
+
+    references = {event.reference for event in events if event.reference}
+    transactions = {
+        transaction.refference: transaction
+        for transaction in Transaction.query.filter(Transaction.refference.in_(references))
+    } if references else {}
+
+    for event in events:
+        event.attempts += 1
+        try:
+            transaction = transactions.get(event.reference)
+            if transaction is None:
+                # The transaction may not be committed yet when the webhook races the checkout
+                retry_later(event, max_attempts, retry_backoff, f"Transaction <{event.reference}> not found")
+                continue
+
+            status = status_rules[event.provider](event.payload, transaction)
+            if status:
+                transaction.status = status
+                event.status = 'processed'
+            else:
+                event.status = 'ignored'
+            event.error = None
+            event.processed_at = func.now()
+
+        except Exception as e:
+            traceback.print_exc()
+            retry_later(event, max_attempts, retry_backoff, str(e)[:255])
+
+    db.session.commit()
+    return sum(1 for event in events if event.status != 'pending')
@@ -6,7 +6,8 @@ from requests.exceptions import ConnectionError, Timeout, RequestException
 from urllib.parse import urlencode
 # from flask_jwt_extended import jwt_optional, get_jwt_claims // deprecated
 from flask_jwt_extended import create_access_token, get_jwt, jwt_required, get_jwt_identity, current_user  # Instead of get_jwt_claims
-from jsonschema import validate, ValidationError
+from jsonschema import ValidationError
+from web.apis.utils.validators import validate
 from flask import (
     abort, current_app, make_response, session, render_template, 
     url_for, request
@@ -16,10 +17,12 @@ from web.apis.utils.decorators import access_required
 from web.apis.utils.users import handle_reset_password, handle_verify_email
 from web.extensions import db, csrf, fake, limiter
 from web.apis.utils.helpers import user_ip
+from web.apis.utils.passwords import PasswordHashingBusy
 from web.apis.models.roles import Role
-from web.apis.models.users import User
+from web.apis.models.users import User, UserIdentifier
+from sqlalchemy.exc import IntegrityError
 from web.apis.utils.serializers import (
-    PageSerializer, error_response, success_response
+    InvalidCursor, PageSerializer, error_response, paginate, success_response
 )
 
 from web.apis.schemas.user import (
@@ -99,6 +102,13 @@ def send_message():
         traceback.format_exc()
         return error_response(str(e))
 
+def taken_message(taken):
+    """Error message for identifiers (`UserIdentifier.taken`) already used by another account."""
+    labels = {'username': 'username', 'email': 'email address', 'phone': 'phone number'}
+    if not taken:
+        return "This account conflicts with an existing one."
+    return f"Please use a different {' and '.join(labels[kind] for kind in taken)}."
+
 @user_bp.route("/users/signup", methods=['POST'])
 @csrf.exempt
 @jwt_required(optional=True)
@@ -125,16 +135,6 @@ def signup():
     if not all(data.get(key) for key in ('username', 'phone', 'email', 'password')):
         return error_response("Must provide ('username', 'phone', 'email', 'password')")
 
-    # Perform checks on the data
-    if db.session.scalar(sa.select(User).where(User.username == data['username'])):
-        return error_response("Please use a different username.")
-
-    if db.session.scalar(sa.select(User).where(User.email == data['email'])):
-        return error_response("Please use a different email address.")
-
-    if db.session.scalar(sa.select(User).where(User.phone == data['phone'])):
-        return error_response("Please use a different phone number.")
-
     role = db.session.query(Role).filter_by(name='user').first()
     
     try:
@@ -161,6 +161,16 @@ def signup():
 
         return success_response("sign up successful.", data=data)
 
+    except IntegrityError:
+        # Uniqueness is enforced by the constraints, only look up which identifier is taken on a conflict
+        db.session.rollback()
+        taken = UserIdentifier.taken(username=data['username'], email=data['email'], phone=data['phone'])
+        return error_response(taken_message(taken), status_code=409)
+
+    except PasswordHashingBusy:
+        db.session.rollback()
+        raise
+
     except Exception as e:
         # Rollback on error and log
         db.session.rollback()
@@ -195,17 +205,16 @@ def signin():
         except ValidationError as e:
             return error_response(e.message)
 
-        # Authentication logic
-        user = User.query.filter(
-            sa.or_(
-                User.email == data['username'],
-                User.phone == data['username'],
-                User.username == data['username']
-            )
-        ).first()
+        # Authentication logic (username, email or phone; identifiers index first, `users` if not backfilled)
+        user = UserIdentifier.find_user(data['username'])
 
         # If user exists and password matches
         if user and user.check_password(data['password']):
+            if user.password_needs_rehash():
+                # Hashed with outdated parameters: upgrade it while the plain password is at hand
+                user.set_password(data['password'])
+                db.session.commit()
+
             access_token = user.make_token(token_type='access')
             refresh_token = user.make_token(token_type='refresh')
 
@@ -228,6 +237,9 @@ def signin():
         # If authentication failed
         return error_response("Invalid username or password.")
 
+    except PasswordHashingBusy:
+        raise
+
     except Exception as e:
         # Log the exception for debugging
         # traceback.print_exc()
@@ -303,9 +315,9 @@ def signout():
         response.delete_cookie('access_token')
         response.delete_cookie('refresh_token')
         
-        # Add the token to a blacklist (using the token's jti)
-        from web.extensions import redis as r
-        r.sadd("blacklist", token['jti'])
+        # Revoke the token (using the token's jti) until it expires
+        from web.apis.utils.revocation import revocation_store
+        revocation_store.revoke(token['jti'], token['exp'])
 
         # Mark the user as offline in the database (optional)
         current_user.online = False
@@ -349,6 +361,9 @@ def change_password():
 
         return success_response("Password changed successfully.")
 
+    except PasswordHashingBusy:
+        raise
+
     except Exception as e:
         return error_response(f"Unexpected error: {str(e)}", status_code=500)
 
@@ -622,12 +637,8 @@ def get_users(user_id=None):
             data=user.get_summary(include_products=True, include_roles=True)
             return success_response("User fetched successfully.", data=data)
 
-        # Pagination parameters
-        page = request.args.get('page', 1, type=int)  # Ensure page is an integer
-        page_size = request.args.get('page_size', 5, type=int)  # Fixed to 'page_size'
-
         # Fetch users with pagination
-        paginated_users = User.query.order_by(desc(User.created_at)).paginate(page=page, per_page=page_size)
+        paginated_users = paginate(User.query.order_by(desc(User.created_at)), User)
         # paginated_users = User.query.order_by(desc(User.created_at)).offset((page - 1) * page_size).limit(page_size).all()
 
         response_data = PageSerializer(pagination_obj=paginated_users, resource_name="users")
@@ -636,6 +647,9 @@ def get_users(user_id=None):
         
         return success_response("Users fetched successfully", data=data)
 
+    except InvalidCursor as e:
+        return error_response(str(e), status_code=400)
+
     except Exception as e:
         traceback.print_exc()
         access_token = request.cookies.get('access_token')
@@ -668,22 +682,6 @@ def update_user(user_id):
         except ValidationError as e:
             return error_response(f"Validation error: {e.message}")
         
-        # Perform checks on the data
-        if 'username' in data and data['username'] != user.username and \
-            db.session.scalar(sa.select(User).where(
-                User.username == data['username'])):
-            return error_response('please use a different username')
-
-        if 'email' in data and data['email'] != user.email and \
-            db.session.scalar(sa.select(User).where(
-                User.email == data['email'])):
-            return error_response('please use a different email address')
-        
-        if 'phone' in data and data['phone'] != user.phone and \
-            db.session.scalar(sa.select(User).where(
-                User.phone == data['phone'])):
-            return error_response('please use a different phone number')
-    
         # Update user attributes
         user.name = data.get('name', user.name)
         user.username = data.get('username', user.username)
@@ -704,6 +702,13 @@ def update_user(user_id):
         data=user.get_summary()
         return success_response("User updated successfully.", data=data)
     
+    except IntegrityError:
+        db.session.rollback()
+        taken = UserIdentifier.taken(
+            exclude_user_id=user.id, username=data.get('username'), email=data.get('email'), phone=data.get('phone')
+        )
+        return error_response(taken_message(taken), status_code=409)
+
     except Exception as e:
         return error_response(f"{str(e)}")
 
@@ -0,0 +1,203 @@
+import traceback
+from flask import current_app
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from web.extensions import redis
+
+class SummaryCache:
+    def __init__(self, prefix='summary'):
+        """
+        Read-through Redis cache for serialized `get_summary()` payloads.
+
+        Each payload is stored once under `<prefix>:<namespace>:id:<id>` and every slug is a small
+        pointer key (`<prefix>:<namespace>:slug:<slug>` -> id), so invalidating by id alone is enough
+        to drop a record. Redis failures never break a request, they are treated as a miss.
+
+        :param prefix:
+            Prefix for every key written by this cache.
+        """
+        self.prefix = prefix
+        self.stats_key = f"{prefix}:stats"
+
+    def key(self, namespace, field, value):
+        return f"{self.prefix}:{namespace}:{field}:{value}"
+
+    @property
+    def ttl(self):
+        return current_app.config.get('SUMMARY_CACHE_TTL', 300)
+
+    def get(self, namespace, identifier, loader):
+        """
+        Return the cached summary for `identifier` (an id or a slug), loading it on a miss.
+
+        :param namespace:
+            Resource name, e.g. 'product' or 'page'.
+
+        :param identifier:
+            The id or slug being requested.
+
+        :param loader:
+            Callable returning the model instance for `identifier` (or None if it does not exist).
+
+        :return:
+            The summary dict, or None when the record does not exist.
+        """
+        identifier = str(identifier)
+        data = self._read(namespace, identifier)
+
+        if data is not None:
+            self.record(namespace, 'hit')
+            return data
+
+        self.record(namespace, 'miss')
+        instance = loader(identifier)
+        if instance is None:
+            return None
+
+        data = instance.get_summary()
+        self.set(namespace, data)
+        return data
+
+    def set(self, namespace, data):
+        """Store a summary under its id, plus a pointer from its slug."""
+        try:
+            pipe = redis.pipeline()
+            pipe.set(self.key(namespace, 'id', data['id']), current_app.json.dumps(data), ex=self.ttl)
+            if data.get('slug'):
+                pipe.set(self.key(namespace, 'slug', data['slug']), data['id'], ex=self.ttl)
+            pipe.execute()
+        except RedisError:
+            traceback.print_exc()
+
+    def invalidate(self, namespace, id=None, *slugs):
+        """Drop the cached summary of record `id` and any slug pointers passed in."""
+        keys = [self.key(namespace, 'slug', slug) for slug in slugs if slug]
+        if id is not None:
+            keys.append(self.key(namespace, 'id', id))
+
+        if not keys:
+            return
+
+        try:
+            redis.delete(*keys)
+        except RedisError:
+            traceback.print_exc()
+
+    def record(self, namespace, outcome):
+        """Count a hit/miss for `namespace`."""
+        try:
+            redis.hincrby(self.stats_key, f"{namespace}:{outcome}", 1)
+        except RedisError:
+            pass
+
+    def stats(self):
+        """
+        Return hit/miss counters per namespace, e.g. `{'product': {'hit': 10, 'miss': 2, 'hit_ratio': 0.83}}`.
+        """
+        counters = {}
+        for field, count in redis.hgetall(self.stats_key).items():
+            namespace, outcome = field.decode('utf-8').split(':', 1)
+            counters.setdefault(namespace, {'hit': 0, 'miss': 0})[outcome] = int(count)
+
+        for values in counters.values():
+            total = values['hit'] + values['miss']
+            values['hit_ratio'] = round(values['hit'] / total, 4) if total else None
+
+        return counters
+
+    def reset_stats(self):
+        redis.delete(self.stats_key)
+
+    def _read(self, namespace, identifier):
+        """Look the identifier up as an id first, then as a slug pointer."""
+        try:
+            raw = None
+            if identifier.isdigit():
+                raw = redis.get(self.key(namespace, 'id', identifier))
+
+            if raw is None:
+                id = redis.get(self.key(namespace, 'slug', identifier))
+                if id is None:
+                    return None
+                raw = redis.get(self.key(namespace, 'id', id.decode('utf-8')))
+                if raw is None:
+                    return None
+
+                data = current_app.json.loads(raw)
+                # A renamed record keeps its id, so make sure the pointer is still current
+                return data if data.get('slug') == identifier else None
+
+            return current_app.json.loads(raw)
+
+        except RedisError:
+            traceback.print_exc()
+            return None
+
+summary_cache = SummaryCache()
+
+class AuthUserCache:
+    fields = ('id', 'name', 'avatar', 'username', 'email', 'valid_email', 'phone', 'is_guest', 'is_deleted', 'role_version')
+
+    def __init__(self, prefix='auth:user'):
+        """
+        Short-lived Redis cache of what authentication needs about a user: the scalar columns in
+        `fields` and the user's role names, stored under `<prefix>:<id>`. Like `SummaryCache`,
+        Redis failures are treated as a miss.
+        """
+        self.prefix = prefix
+
+    def key(self, user_id):
+        return f"{self.prefix}:{user_id}"
+
+    @property
+    def ttl(self):
+        return current_app.config.get('AUTH_USER_CACHE_TTL', 60)
+
+    def get(self, user_id):
+        try:
+            raw = redis.get(self.key(user_id))
+        except RedisError:
+            traceback.print_exc()
+            return None
+        return current_app.json.loads(raw) if raw is not None else None
+
+    def set(self, user):
+        data = {field: getattr(user, field) for field in self.fields}
+        data['roles'] = [role.name for role in user.roles]
+        try:
+            redis.set(self.key(user.id), current_app.json.dumps(data), ex=self.ttl)
+        except RedisError:
+            traceback.print_exc()
+        return data
+
+    def invalidate(self, *user_ids):
+        keys = [self.key(user_id) for user_id in user_ids if user_id is not None]
+        if not keys:
+            return
+        try:
+            redis.delete(*keys)
+        except RedisError:
+            traceback.print_exc()
+
+    def invalidate_on_commit(self, session, *user_ids):
+        """
+        Invalidate `user_ids` once `session` commits. Deleting them from a flush would let a
+        concurrent request cache the rows as they were before the commit.
+        """
+        if session is None:
+            return self.invalidate(*user_ids)
+        session.info.setdefault('auth_user_cache_invalidate', set()).update(user_ids)
+
+auth_user_cache = AuthUserCache()
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_committed_auth_users(session):
+    user_ids = session.info.pop('auth_user_cache_invalidate', None)
+    if user_ids:
+        auth_user_cache.invalidate(*user_ids)
+
+@event.listens_for(Session, 'after_rollback')
+def forget_rolled_back_auth_users(session):
+    # Nothing was written, the cached entries are still current
+    session.info.pop('auth_user_cache_invalidate', None)
@@ -39,17 +39,15 @@ class ConnectionManager:
 
     @jwt_required(optional=True)
     def connect(self, socket_id):
-        # Attempt to get the current user's identity from the JWT token
-        user = get_jwt_identity()  # This will return None if the user is not authenticated
+        # Sockets are keyed by username (`notify`, `notify_group`); the token's `sub` is the user id
+        user = current_user if get_jwt_identity() else None  # None if the user is not authenticated
 
         if user:
-            username = str(user)  # Use the user's identity (e.g., username)
+            username = user.username
             print("Authenticated user:", username)
         else:
-            # If no user is found, retrieve all claims
-            claims = get_jwt()  # Get all claims from the JWT
-            username = str(claims.get('username', request.remote_addr))  # Fallback to IP if username not found
-            print("No authenticated user, using claims or IP:", username)
+            username = request.remote_addr  # Anonymous sockets are keyed by IP
+            print("No authenticated user, using IP:", username)
 
         # Check if the user is already connected with the same IP
         existing_username = redis_client.hget(self.redis_key, request.remote_addr)
@@ -106,8 +104,7 @@ class ConnectionManager:
 
         # Get all active connections for users in the group
         for user in group.users:
-            # Attempt to get the socket ID using username first, then email
-            socket_id = self.get_socket(user.username) or self.get_socket(user.email)
+            socket_id = self.get_socket(user.username)
         
             if socket_id:
                 print(f"Emitting group event '{event}' to socket ID: {socket_id} for users {user.username} with data {data}")
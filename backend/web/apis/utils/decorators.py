@@ -1,7 +1,18 @@
 from functools import wraps
-from flask_jwt_extended import current_user, jwt_required
+from flask_jwt_extended import current_user, get_jwt, jwt_required
+from web.apis.models.roles import Role
 from web.apis.utils.serializers import error_response
 
+def has_any_role(*required_roles):
+    """
+    Whether the current user has one of `required_roles`, answered from the token's role bitmask
+    ('rl') while its role version ('rv') is current, from the user's roles otherwise.
+    """
+    claims = get_jwt()
+    if 'rl' in claims and claims.get('rv') == (current_user.role_version or 0):
+        return bool(claims['rl'] & Role.mask(*required_roles))
+    return any(role in current_user.get_roles() for role in required_roles)
+
 def confirm_email(func):
     """Check if email has been confirmed"""
     @wraps(func)
@@ -28,7 +39,7 @@ def access_required_former(*required_roles, strict=False):
 
             # Strict access check
             if strict:
-                user_has_role = any(role_x in [role_y.name for role_y in current_user.roles] for role_x in required_roles)
+                user_has_role = has_any_role(*required_roles)
                 if user_has_role:
                     return view_func(*args, **kwargs)
                 else:
@@ -39,7 +50,7 @@ def access_required_former(*required_roles, strict=False):
                 return view_func(*args, **kwargs)
 
             # Check for required roles
-            user_has_role = any(role_x in [role_y.name for role_y in current_user.roles] for role_x in required_roles)
+            user_has_role = has_any_role(*required_roles)
             allow_all = any('*' in role for role in required_roles)
 
             if user_has_role or allow_all:
@@ -70,7 +81,7 @@ def access_required(*required_roles, strict=False):
             requested_user_id = kwargs.get('user_id')  # This is the user identifier from the URL or route parameters
 
             # Check if user has any of the required roles
-            user_has_role = any(role in [role_y.name for role_y in current_user.roles] for role in required_roles)
+            user_has_role = has_any_role(*required_roles)
             allow_all = any(role == '*' for role in required_roles)
 
             # Grant access if user has a required role or if `*` is present
@@ -96,7 +107,7 @@ def role_required(*required_roles):
         @wraps(view_func)
         @jwt_required()  # Ensure JWT is required for this route
         def wrapper(*args, **kwargs):
-            user_has_role = any(role_x in [role_y.name for role_y in current_user.roles] for role_x in required_roles)
+            user_has_role = has_any_role(*required_roles)
             allow_all = any('*' in role for role in required_roles)
 
             if user_has_role or allow_all:
@@ -1,13 +1,12 @@
 from flask import current_app, render_template
 from flask_mail import Message
-from threading import Thread
-import traceback
 # from web.apis.utils.helpers import error_response, success_response
-from web.extensions import mail
+from web.apis.utils.mailer import mailer
 
 def send_email(subject, sender=None, recipients=None, text_body='', html_body=''):
     """
-    Sends an email asynchronously using Flask-Mail.
+    Queues an email for the background mailer (see `web.apis.utils.mailer`), which sends it
+    over a pooled SMTP connection.
     
     Args:
         subject (str): The subject of the email.
@@ -16,15 +15,9 @@ def send_email(subject, sender=None, recipients=None, text_body='', html_body=''
         text_body (str, optional): The plain-text content of the email.
         html_body (str, optional): The HTML content of the email.
 
+    Returns:
+        bool: False if the message was dropped because the mail queue is full.
     """
-    def send_async_email(app, msg):
-        try:
-            with app.app_context():
-                mail.send(msg)
-                print("Success: Email sent successfully!")
-        except Exception:
-            traceback.print_exc()
-
     # Use default sender from app configuration if sender is not provided
     if sender is None:
         sender = current_app.config.get('MAIL_DEFAULT_SENDER')
@@ -41,8 +34,8 @@ def send_email(subject, sender=None, recipients=None, text_body='', html_body=''
     msg.body = text_body
     msg.html = html_body
 
-    # Use Flask's application context in a separate thread
-    Thread(target=send_async_email, args=(current_app._get_current_object(), msg)).start()
+    # Hand it to the mailer workers, they hold the SMTP connections
+    return mailer().send(msg)
 
 def reset_email(user):
     token = user.make_token(token_type="reset_password")
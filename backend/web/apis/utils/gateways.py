@@ -0,0 +1,140 @@
+import threading
+import time
+from flask import current_app
+from requests import Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, RequestException, Timeout
+from urllib3.util.retry import Retry
+
+class CircuitOpenError(RequestException):
+    """Raised instead of calling a gateway that keeps failing; handled like any other `RequestException`."""
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """
+        Stop calling a gateway after `failure_threshold` consecutive failures (connection errors,
+        timeouts, 5xx). After `reset_timeout` seconds one trial call is let through: success closes
+        the circuit again, failure re-opens it.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def before_call(self, name):
+        with self._lock:
+            state = self.state
+            if state == 'open':
+                raise CircuitOpenError(f"{name} is unavailable, retry in {self.reset_timeout}s.")
+            if state == 'half-open':
+                # Let this call through as the trial, hold the others back until it reports
+                self.opened_at = time.monotonic()
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+class GatewayClient:
+    def __init__(self, name, base_url, connect_timeout=3.05, read_timeout=20, retries=2, backoff_factor=0.5,
+                 pool_connections=4, pool_maxsize=20, failure_threshold=5, reset_timeout=30):
+        """
+        HTTP client for one payment provider: a `requests.Session` whose keep-alive connection
+        pool is reused by every payment, with default connect/read timeouts, bounded retries with
+        exponential backoff and a circuit breaker.
+
+        Only idempotent methods are retried on read errors and 429/5xx answers; a POST is only
+        retried when the connection could not be established (nothing was sent).
+
+        :param name: Provider name, used in errors.
+        :param base_url: Prefix of relative URLs, e.g. 'https://api.paystack.co'.
+        """
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        self.session = Session()
+        self.session.headers.update({'accept': 'application/json'})
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def url(self, url):
+        return url if url.startswith(('http://', 'https://')) else f"{self.base_url}/{url.lstrip('/')}"
+
+    def request(self, method, url, **kwargs):
+        """`requests.Session.request` with the client's timeouts, behind the circuit breaker."""
+        self.breaker.before_call(self.name)
+        kwargs.setdefault('timeout', self.timeout)
+        try:
+            response = self.session.request(method, self.url(url), **kwargs)
+        except (ConnectionError, Timeout):
+            self.breaker.failure()
+            raise
+
+        if response.status_code >= 500:
+            self.breaker.failure()
+        else:
+            self.breaker.success()
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def gateway(name):
+    """
+    The shared client of provider `name` ('paystack', 'flutterwave', ...), created on first use
+    from the `<NAME>_BASE_URL` and `GATEWAY_*` config values.
+    """
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                config = current_app.config
+                client = GatewayClient(
+                    name,
+                    config[f'{name.upper()}_BASE_URL'],
+                    connect_timeout=config.get('GATEWAY_CONNECT_TIMEOUT', 3.05),
+                    read_timeout=config.get('GATEWAY_READ_TIMEOUT', 20),
+                    retries=config.get('GATEWAY_RETRIES', 2),
+                    pool_maxsize=config.get('GATEWAY_POOL_SIZE', 20),
+                    failure_threshold=config.get('GATEWAY_FAILURE_THRESHOLD', 5),
+                    reset_timeout=config.get('GATEWAY_RESET_TIMEOUT', 30),
+                )
+                _clients[name] = client
+    return client
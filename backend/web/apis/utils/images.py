@@ -0,0 +1,217 @@
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from os import makedirs, path, remove, replace
+from uuid import uuid4
+import cv2
+import numpy as np
+
+# name -> bounding box (width, height); every rendition is also produced as WebP (`<name>_webp`)
+renditions = {
+    'thumbnail': (150, 150),
+    'card': (400, 400),
+    'full': (1200, 1200),
+}
+
+image_extensions = ['.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp']
+
+# Formats OpenCV can encode; other sources (e.g. GIF) get PNG renditions
+encodable_extensions = ['.jpg', '.jpeg', '.png', '.webp', '.bmp']
+
+_executor = None
+
+def write_atomic(full_path, content):
+    """ Write to a temporary file next to `full_path`, then rename it into place. """
+    makedirs(path.dirname(full_path), exist_ok=True)
+    temp_path = f"{full_path}.{uuid4().hex}.part"
+    try:
+        with open(temp_path, 'wb') as temp_file:
+            temp_file.write(content)
+        replace(temp_path, full_path)
+    finally:
+        if path.exists(temp_path):
+            remove(temp_path)
+
+def fit(img, width, height):
+    """ Downscale `img` to fit in `width` x `height`, keeping its aspect ratio (never upscales). """
+    h, w = img.shape[:2]
+    scale = min(width / w, height / h, 1)
+    if scale == 1:
+        return img
+    return cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+def dhash(img):
+    """
+    64-bit difference hash of a decoded image, as 16 hex characters: one bit per pair of
+    horizontally adjacent pixels of a 9x8 grayscale thumbnail. Re-encoded or resized copies
+    of a photo land within a few bits of each other.
+    """
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY if img.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return np.packbits(bits).tobytes().hex()
+
+def process_image(source_path):
+    """
+    Decode the image at `source_path` once and derive its renditions and perceptual hash from it.
+    Runs in a worker process.
+
+    Returns:
+        tuple: (renditions as returned by `render_renditions`, dHash hex string)
+    """
+    img = cv2.imread(source_path, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise ValueError(f"Invalid image format: {source_path}")
+    return render_renditions(source_path, img=img), dhash(img)
+
+def render_renditions(source_path, sizes=None, img=None):
+    """
+    Produce every rendition of the image at `source_path` next to it, e.g. `<hash>_card.jpg` and
+    `<hash>_card.webp`. Runs in a worker process, so it only touches the filesystem.
+
+    Renditions already on disk are kept, so processing a deduplicated upload again is cheap.
+
+    Returns:
+        dict: {rendition name: {'path', 'width', 'height', 'format', 'size'}}
+    """
+    if img is None:
+        img = cv2.imread(source_path, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise ValueError(f"Invalid image format: {source_path}")
+
+    base, extension = path.splitext(source_path)
+    extension = extension.lower() if extension.lower() in encodable_extensions else '.png'
+
+    result = {}
+    for name, (width, height) in (sizes or renditions).items():
+        resized = fit(img, width, height)
+        for key, fmt in ((name, extension), (f"{name}_webp", '.webp')):
+            target = f"{base}_{name}{fmt}"
+            if not path.exists(target):
+                ok, encoded = cv2.imencode(fmt, resized)
+                if not ok:
+                    raise ValueError(f"Could not encode {target}")
+                write_atomic(target, encoded.tobytes())
+
+            result[key] = {
+                'path': target,
+                'width': resized.shape[1],
+                'height': resized.shape[0],
+                'format': fmt.lstrip('.'),
+                'size': path.getsize(target),
+            }
+    return result
+
+def executor(app):
+    """ Process pool shared by the app. Workers are spawned, not forked, so no DB connection is inherited. """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=app.config.get('IMAGE_PIPELINE_WORKERS', 2),
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+def queue_renditions(images):
+    """
+    Render the renditions of freshly committed `FileUpload` rows in the background. Rows stay
+    `pending` until their renditions are stored, then become `ready` (or `failed`).
+
+    With `IMAGE_PIPELINE_WORKERS = 0` the renditions are rendered inline instead.
+    """
+    from flask import current_app
+
+    # Deduplicated uploads share a file, render it once for all the rows pointing at it
+    sources = {}
+    for image in images:
+        if image.status == 'pending':
+            sources.setdefault(image.file_path, []).append(image.id)
+
+    app = current_app._get_current_object()
+    for source_path, image_ids in sources.items():
+        if path.splitext(source_path)[1].lower() not in image_extensions:
+            # Videos/SVGs have no renditions
+            save_renditions(app, image_ids, {})
+        elif not app.config.get('IMAGE_PIPELINE_WORKERS', 2):
+            save_renditions(app, image_ids, *_render(source_path))
+        else:
+            try:
+                future = executor(app).submit(process_image, source_path)
+                future.add_done_callback(partial(_on_rendered, app, image_ids))
+            except Exception:
+                # Broken/shut down pool: leave the rows pending, they can be re-queued later
+                traceback.print_exc()
+
+def _render(source_path):
+    try:
+        return process_image(source_path)
+    except Exception:
+        traceback.print_exc()
+        return None, None
+
+def _on_rendered(app, image_ids, future):
+    try:
+        result, phash = future.result()
+    except Exception:
+        traceback.print_exc()
+        result, phash = None, None
+    save_renditions(app, image_ids, result, phash)
+
+def save_renditions(app, image_ids, result, phash=None):
+    """
+    Store rendered renditions (and the perceptual hash) on the `FileUpload` rows; a `None` result
+    marks them failed. Rows are then flagged as near-duplicates of earlier uploads (see `flag_duplicates`).
+    """
+    from web.extensions import db
+    from web.apis.models.file_uploads import FileUpload, ProductImage
+    from web.apis.utils.cache import summary_cache
+
+    with app.app_context():
+        values = {'renditions': result or None, 'status': 'failed' if result is None else 'ready'}
+        if phash:
+            values['phash'] = phash
+            values.update({f'phash_band_{i}': band for i, band in enumerate(FileUpload.phash_bands(phash))})
+
+        FileUpload.query.filter(FileUpload.id.in_(image_ids)).update(values, synchronize_session=False)
+        db.session.commit()
+
+        if phash:
+            flag_duplicates(image_ids, phash)
+
+        # Bulk updates skip the mapper events that keep cached product summaries fresh
+        product_ids = db.session.query(ProductImage.product_id).filter(ProductImage.id.in_(image_ids)).distinct()
+        for (product_id,) in product_ids:
+            if product_id is not None:
+                summary_cache.invalidate('product', product_id)
+
+def flag_duplicates(image_ids, phash):
+    """
+    Point `duplicate_of_id` of freshly processed rows at the closest earlier upload within
+    `PHASH_MAX_DISTANCE` bits. With `PHASH_REUSE_DUPLICATES` the rows are also switched to the
+    original's file and renditions, leaving their own file to the orphaned upload collector.
+    """
+    from flask import current_app
+    from web.extensions import db
+    from web.apis.models.file_uploads import FileUpload
+
+    config = current_app.config
+    matches = FileUpload.find_near_duplicates(
+        phash, max_distance=config.get('PHASH_MAX_DISTANCE', 3), exclude_ids=image_ids
+    )
+    if not matches:
+        return
+
+    original = db.session.get(FileUpload, matches[0][1])
+    if original is None:
+        return
+    if original.duplicate_of_id:
+        original = db.session.get(FileUpload, original.duplicate_of_id) or original
+
+    values = {'duplicate_of_id': original.id}
+    if config.get('PHASH_REUSE_DUPLICATES') and original.status == 'ready':
+        values.update({'file_path': original.file_path, 'renditions': original.renditions})
+
+    FileUpload.query.filter(FileUpload.id.in_(image_ids)).update(values, synchronize_session=False)
+    db.session.commit()
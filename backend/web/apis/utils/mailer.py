@@ -0,0 +1,179 @@
+import os
+import queue
+import threading
+import time
+import traceback
+from smtplib import SMTPException, SMTPRecipientsRefused, SMTPResponseException
+from flask import current_app
+from web.extensions import mail
+
+class Mailer:
+    def __init__(self, workers=2, queue_size=1000, batch_size=50, idle_timeout=5, max_retries=3, retry_backoff=2):
+        """
+        Background mail dispatch: a bounded queue drained by a fixed set of worker threads.
+
+        A worker opens one SMTP connection (Flask-Mail `mail.connect()`) and keeps sending on it
+        while messages keep coming, up to `batch_size` messages or `idle_timeout` seconds without
+        one, so a burst costs one TLS handshake and login per worker instead of one per message.
+
+        Messages failing with a connection error or a 4xx answer are queued again, not to be sent
+        before `retry_backoff * 2 ** attempt` seconds, up to `max_retries` times; 5xx answers and
+        refused recipients are dropped. When the queue is full new messages are dropped, never
+        blocking the request.
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.counters = {'queued': 0, 'sent': 0, 'retried': 0, 'failed': 0, 'dropped': 0, 'connections': 0}
+        self._app = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def stats(self):
+        """Queue depth and counters since the process started."""
+        with self._lock:
+            counters = dict(self.counters)
+        counters.update({'depth': self.queue.qsize(), 'capacity': self.queue.maxsize, 'workers': self.workers})
+        return counters
+
+    def send(self, message):
+        """Queue a Flask-Mail `Message`. Returns False if it was dropped because the queue is full."""
+        self._start()
+        try:
+            self.queue.put_nowait((message, 0, 0))  # (message, attempts, not before)
+        except queue.Full:
+            self.count('dropped')
+            current_app.logger.error("Mail queue full, dropped %r to %s", message.subject, message.recipients)
+            return False
+        self.count('queued')
+        return True
+
+    def join(self):
+        """Block until every queued message has been sent or given up on (scripts, tests)."""
+        self.queue.join()
+
+    def _start(self):
+        """Start the workers of this process on first use (after any fork of the server)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._app = current_app._get_current_object()
+            for number in range(self.workers):
+                threading.Thread(target=self._work, name=f'mailer-{number}', daemon=True).start()
+
+    def _work(self):
+        while True:
+            try:
+                item = self.queue.get()
+                wait = item[2] - time.monotonic()
+                if wait > 0:
+                    # A retry that is not due yet: back in the queue, look again shortly
+                    self._requeue(item)
+                    time.sleep(min(wait, 1))
+                    continue
+                with self._app.app_context():
+                    self._send_batch(item)
+            except Exception:
+                # Keep the worker alive whatever happens
+                traceback.print_exc()
+
+    def _requeue(self, item):
+        """Put a dequeued `item` back at the end of the queue."""
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.count('dropped')
+        self.queue.task_done()
+
+    def _send_batch(self, item):
+        """Send `item` and whatever follows it on one connection."""
+        sent = 0
+        try:
+            with mail.connect() as connection:
+                self.count('connections')
+                while item is not None:
+                    message, attempts, _ = item
+                    try:
+                        connection.send(message)
+                        self.count('sent')
+                    except (SMTPRecipientsRefused, SMTPResponseException) as e:
+                        # Answered by the server, the connection is still usable
+                        if getattr(e, 'smtp_code', 550) >= 500:
+                            self.count('failed')
+                            current_app.logger.error("Mail %r to %s rejected: %s", message.subject, message.recipients, e)
+                        else:
+                            self._retry(message, attempts)
+                    except (SMTPException, OSError):
+                        raise
+                    except Exception:
+                        # A message that cannot be built/sent at all, retrying would not help
+                        traceback.print_exc()
+                        self.count('failed')
+                    item = None
+                    self.queue.task_done()
+
+                    sent += 1
+                    if sent >= self.batch_size:
+                        break
+                    try:
+                        item = self.queue.get(timeout=self.idle_timeout)
+                    except queue.Empty:
+                        item = None
+                    if item is not None and item[2] > time.monotonic():
+                        # Not due yet: leave it to `_work` and close this connection
+                        self._requeue(item)
+                        item = None
+
+        except (SMTPException, OSError):
+            # Connection lost or refused: retry the message in hand, the next batch reconnects
+            traceback.print_exc()
+            if item is not None:
+                self._retry(item[0], item[1])
+                self.queue.task_done()
+        except Exception:
+            # e.g. broken mail settings: give the message in hand up rather than leave it unfinished
+            traceback.print_exc()
+            if item is not None:
+                self.count('failed')
+                self.queue.task_done()
+
+    def _retry(self, message, attempts):
+        if attempts >= self.max_retries:
+            self.count('failed')
+            current_app.logger.error("Mail %r to %s failed after %s attempts", message.subject, message.recipients, attempts + 1)
+            return
+
+        # Queued with a not-before time, the worker moves on to the other messages meanwhile
+        not_before = time.monotonic() + min(60, self.retry_backoff * 2 ** attempts)
+        try:
+            self.queue.put_nowait((message, attempts + 1, not_before))
+            self.count('retried')
+        except queue.Full:
+            self.count('dropped')
+
+_mailer = None
+
+def mailer():
+    """The app's shared `Mailer`, built from the `MAIL_*` dispatch config on first use."""
+    global _mailer
+    if _mailer is None:
+        config = current_app.config
+        _mailer = Mailer(
+            workers=config.get('MAIL_WORKERS', 2),
+            queue_size=config.get('MAIL_QUEUE_SIZE', 1000),
+            batch_size=config.get('MAIL_BATCH_SIZE', 50),
+            idle_timeout=config.get('MAIL_IDLE_TIMEOUT', 5),
+            max_retries=config.get('MAIL_MAX_RETRIES', 3),
+            retry_backoff=config.get('MAIL_RETRY_BACKOFF', 2),
+        )
+    return _mailer
@@ -0,0 +1,107 @@
+import threading
+import traceback
+from contextlib import contextmanager
+from os import path, remove, scandir, utime
+from redis.exceptions import RedisError
+from web.extensions import redis
+
+class DiskLRUCache:
+    def __init__(self, directory, max_bytes):
+        """
+        Files on disk evicted least-recently-used first once they exceed `max_bytes` in total.
+
+        Recency is the file mtime (bumped on every hit), so the order is shared by every worker
+        process using the directory. Each process keeps a running estimate of the total size and
+        only rescans the directory when that estimate goes over the limit.
+
+        :param directory:
+            Where cached files live (sharded in sub-directories by the first two characters of the key).
+
+        :param max_bytes:
+            Total size the cache is trimmed back under.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._total = None
+        self._lock = threading.Lock()
+
+    def path(self, key):
+        return path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """Return the path of a cached file (marking it recently used), or None on a miss."""
+        file_path = self.path(key)
+        try:
+            utime(file_path)
+        except FileNotFoundError:
+            return None
+        return file_path
+
+    def added(self, file_path):
+        """Account for a file just written to the cache, evicting old files when over budget."""
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan_total()
+            else:
+                self._total += path.getsize(file_path)
+
+            if self._total > self.max_bytes:
+                self._total = self.evict()
+
+    def evict(self, target_ratio=0.9):
+        """Delete least recently used files until the cache is under `target_ratio` of its budget."""
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * target_ratio
+
+        for file_path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                remove(file_path)
+                total -= size
+            except FileNotFoundError:
+                total -= size
+        return total
+
+    def _scan_total(self):
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        """(path, mtime, size) of every cached file."""
+        if not path.isdir(self.directory):
+            return []
+
+        entries = []
+        for shard in scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in scandir(shard.path):
+                if entry.is_file() and not entry.name.endswith('.part'):
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_mtime, stat.st_size))
+        return entries
+
+@contextmanager
+def single_flight(key, timeout=30):
+    """
+    Let one worker (across processes) compute `key` while the others wait for it.
+
+    Backed by a Redis lock; if Redis is unavailable every caller proceeds, which is still
+    correct because cache files are written atomically.
+    """
+    lock = redis.lock(f"media:lock:{key}", timeout=timeout, blocking_timeout=timeout)
+    acquired = False
+    try:
+        acquired = lock.acquire()
+    except RedisError:
+        traceback.print_exc()
+
+    try:
+        yield
+    finally:
+        if acquired:
+            try:
+                lock.release()
+            except RedisError:
+                pass
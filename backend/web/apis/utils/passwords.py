@@ -0,0 +1,104 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from flask import current_app
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import check_password_hash, generate_password_hash
+
+class PasswordHashingBusy(ServiceUnavailable):
+    """Raised when too many hashes are queued; answered with a 503 and a Retry-After header."""
+    description = "Too many sign-ins at the moment, please retry shortly."
+
+class PasswordHasher:
+    def __init__(self, method='scrypt:32768:8:1', salt_length=16, workers=2, max_pending=16, timeout=10):
+        """
+        Password hashing (werkzeug's `generate_password_hash` / `check_password_hash`) run on a
+        process pool, so a burst of sign-ins keeps the request workers free instead of pinning
+        them on scrypt.
+
+        At most `max_pending` hashes may be queued or running; past that `PasswordHashingBusy` is
+        raised right away rather than letting requests pile up. With `workers = 0` hashes are
+        computed inline.
+
+        :param method:
+            werkzeug hash method with its parameters, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'.
+            Stored hashes made with another method are reported by `needs_rehash`.
+        """
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._method_prefix = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # Spawned, not forked, so no DB connection or lock is inherited
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+    def run(self, function, *args):
+        if not self.workers:
+            return function(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy(retry_after=1)
+        try:
+            future = self.executor.submit(function, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise PasswordHashingBusy(retry_after=self.timeout)
+
+    def hash(self, password):
+        return self.run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        return self.run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """Whether `pwhash` was made with other parameters than the configured method."""
+        if self._method_prefix is None:
+            self._method_prefix = self.method_prefix()
+        return pwhash.split('$', 1)[0] != self._method_prefix
+
+    def method_prefix(self):
+        """
+        The method as werkzeug writes it in front of a hash, e.g. 'scrypt:32768:8:1'. Fully
+        specified methods are normalized like werkzeug does; for others ('scrypt') werkzeug fills
+        in its defaults, so a hash is made through the pool to read them.
+        """
+        name, *params = self.method.split(':')
+        if name == 'scrypt' and len(params) == 3:
+            return 'scrypt:' + ':'.join(str(int(param)) for param in params)
+        if name == 'pbkdf2' and len(params) == 2:
+            return f"pbkdf2:{params[0]}:{int(params[1])}"
+        return self.hash('').split('$', 1)[0]
+
+_hasher = None
+
+def password_hasher():
+    """The app's shared `PasswordHasher`, built from the `PASSWORD_HASH_*` config on first use."""
+    global _hasher
+    if _hasher is None:
+        config = current_app.config
+        _hasher = PasswordHasher(
+            method=config.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1'),
+            salt_length=config.get('PASSWORD_HASH_SALT_LENGTH', 16),
+            workers=config.get('PASSWORD_HASH_WORKERS', 2),
+            max_pending=config.get('PASSWORD_HASH_MAX_PENDING', 16),
+            timeout=config.get('PASSWORD_HASH_TIMEOUT', 10),
+        )
+    return _hasher
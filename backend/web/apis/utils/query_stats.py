@@ -0,0 +1,144 @@
+import json
+import re
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from web.extensions import db
+
+_whitespace = re.compile(r"\s+")
+_strings = re.compile(r"'(?:[^']|'')*'")
+_numbers = re.compile(r"\b\d+(?:\.\d+)?\b")
+_placeholder_lists = re.compile(r"\(\s*(?:%s|\?|%\(\w+\)s)(?:\s*,\s*(?:%s|\?|%\(\w+\)s))*\s*\)")
+
+# Captures opened with `capture_queries()`, recorded in addition to the request's own stats
+_captures = []
+
+def fingerprint(statement):
+    """Normalize a statement so the same query with different literals or IN-list sizes compares equal."""
+    statement = _whitespace.sub(' ', statement).strip()
+    statement = _strings.sub('?', statement)
+    statement = _numbers.sub('?', statement)
+    return _placeholder_lists.sub('(?)', statement)
+
+class QueryStats:
+    def __init__(self):
+        """Statements executed during one request (or one `capture_queries()` block)."""
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+        self.fingerprints = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.statements.append(statement)
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def suspects(self, threshold=5):
+        """Statements repeated at least `threshold` times, i.e. likely N+1 lazy loads."""
+        return {sql: count for sql, count in self.fingerprints.most_common() if count >= threshold}
+
+    def server_timing(self):
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = perf_counter() - conn.info['query_start'].pop()
+
+    for stats in _captures:
+        stats.record(statement, duration)
+
+    if has_app_context():
+        stats = g.get('query_stats')
+        if stats is not None:
+            stats.record(statement, duration)
+
+def _listen(engine):
+    # Only the `db` engine is counted, not any other engine living in the process
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+def _start_request():
+    g.query_stats = QueryStats()
+
+def _finish_request(response):
+    stats = g.pop('query_stats', None)
+    if stats is None:
+        return response
+
+    response.headers.add('Server-Timing', stats.server_timing())
+
+    suspects = stats.suspects(current_app.config.get('QUERY_STATS_N_PLUS_ONE_THRESHOLD', 5))
+    current_app.logger.info(json.dumps({
+        'event': 'query_stats',
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'queries': stats.count,
+        'db_ms': round(stats.duration * 1000, 2),
+        'n_plus_one': suspects,
+    }))
+    return response
+
+def init_query_stats(app):
+    """
+    Count the statements every request executes and report them as a `Server-Timing` header and a
+    JSON log line, flagging statements repeated `QUERY_STATS_N_PLUS_ONE_THRESHOLD` times or more.
+
+    Enabled with the `QUERY_STATS` config.
+    """
+    if not app.config.get('QUERY_STATS'):
+        return
+
+    with app.app_context():
+        _listen(db.engine)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+@contextmanager
+def capture_queries(engine=None):
+    """
+    Record every statement executed inside the block, whatever request or context runs it.
+
+        with capture_queries() as stats:
+            client.get('/api/products')
+        print(stats.count, stats.suspects())
+
+    `engine` defaults to `db.engine` of the current app.
+    """
+    _listen(engine if engine is not None else db.engine)
+
+    stats = QueryStats()
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+def assert_max_queries(client, max_queries, path, method='GET', **kwargs):
+    """
+    Test helper: call `path` with the Flask test `client` and fail if it executes more than `max_queries`
+    statements. Extra keyword arguments are passed to `client.open()` (headers, json, ...).
+
+    :return: the response, for further assertions.
+    """
+    with client.application.app_context():
+        engine = db.engine
+
+    with capture_queries(engine) as stats:
+        response = client.open(path, method=method, **kwargs)
+
+    if stats.count > max_queries:
+        details = '\n'.join(f"  {count}x {sql}" for sql, count in stats.suspects(2).items())
+        raise AssertionError(
+            f"{method} {path} executed {stats.count} queries, expected at most {max_queries}."
+            + (f"\nRepeated statements:\n{details}" if details else '')
+        )
+    return response
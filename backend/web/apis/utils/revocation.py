@@ -0,0 +1,126 @@
+import hashlib
+import math
+import os
+import threading
+import time
+import traceback
+from flask import current_app
+from redis.exceptions import RedisError
+from web.extensions import redis
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.001):
+        """
+        Set membership with no false negatives and about `error_rate` false positives while it
+        holds up to `capacity` items (more items only raise the false-positive rate).
+        """
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class RevocationStore:
+    def __init__(self, prefix='revoked'):
+        """
+        Revoked JWTs, one Redis key per `jti` (`<prefix>:<jti>`) that expires with the token.
+
+        Every process keeps a Bloom filter of the revoked ids, filled from a SCAN of the keys and
+        kept current by a pub/sub listener thread, so checking a token that was never revoked
+        needs no round-trip. A filter hit is confirmed with an EXISTS (false positives, expired
+        keys). The filter is rebuilt periodically to shed expired ids, and whenever the listener
+        loses its connection; until it is back every check goes to Redis.
+        """
+        self.prefix = prefix
+        self.channel = f"{prefix}:events"
+        self.filter = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def key(self, jti):
+        return f"{self.prefix}:{jti}"
+
+    def revoke(self, jti, exp):
+        """Revoke token `jti` until its `exp` (a Unix timestamp) and tell the other processes."""
+        ttl = max(1, int(exp - time.time()))
+        pipe = redis.pipeline()
+        pipe.set(self.key(jti), 1, ex=ttl)
+        pipe.publish(self.channel, jti)
+        pipe.execute()
+
+        if self.filter is not None:
+            self.filter.add(jti)
+
+    def is_revoked(self, jti):
+        self._start()
+        bloom = self.filter
+        if bloom is not None and jti not in bloom:
+            return False
+        return bool(redis.exists(self.key(jti)))
+
+    def build_filter(self, capacity, error_rate):
+        bloom = BloomFilter(capacity, error_rate)
+        start = len(self.prefix) + 1
+        for key in redis.scan_iter(match=f"{self.prefix}:*", count=1000):
+            bloom.add(key.decode('utf-8')[start:])
+        return bloom
+
+    def _start(self):
+        """Start the listener of this process on first use (after any fork of the server)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.filter = None
+            config = current_app.config
+            threading.Thread(
+                target=self._listen,
+                args=(
+                    config.get('REVOCATION_BLOOM_CAPACITY', 100000),
+                    config.get('REVOCATION_BLOOM_ERROR_RATE', 0.001),
+                    config.get('REVOCATION_BLOOM_REBUILD_SECONDS', 600),
+                ),
+                name='jwt-revocations',
+                daemon=True,
+            ).start()
+
+    def _listen(self, capacity, error_rate, rebuild_seconds):
+        while True:
+            pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                # Subscribe before scanning so no revocation falls between the two
+                pubsub.subscribe(self.channel)
+                self.filter = self.build_filter(capacity, error_rate)
+                built_at = time.monotonic()
+
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self.filter.add(message['data'].decode('utf-8'))
+                    if time.monotonic() - built_at >= rebuild_seconds:
+                        self.filter = self.build_filter(capacity, error_rate)
+                        built_at = time.monotonic()
+
+            except RedisError:
+                traceback.print_exc()
+                self.filter = None
+                time.sleep(1)
+            finally:
+                try:
+                    pubsub.close()
+                except RedisError:
+                    pass
+
+revocation_store = RevocationStore()
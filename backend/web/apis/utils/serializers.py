@@ -1,5 +1,98 @@
+import base64
+from datetime import datetime
 from flask import request, jsonify, url_for
 from flask_sqlalchemy.pagination import QueryPagination
+from sqlalchemy import and_, desc, or_
+
+class InvalidCursor(ValueError):
+    """A `?cursor=` value that was not produced by `CursorPagination.encode`; a client error (400)."""
+
+class CursorPagination:
+    def __init__(self, query, model, cursor=None, per_page=5, with_total=False):
+        """
+        Keyset (cursor) page of `query`, ordered by `(created_at, id)` descending.
+
+        Unlike `.paginate()` this issues no `OFFSET` and skips the `COUNT(*)` unless 
+        `with_total` is set, so deep pages cost the same as the first one.
+
+        :param query: 
+            The (optionally filtered) query to page through. Any ordering is replaced.
+
+        :param model: 
+            The model being listed; it must have `created_at` and `id` columns.
+
+        :param cursor: 
+            Opaque cursor from a previous page's `next_cursor`, or None for the first page.
+
+        :param per_page: 
+            Number of items per page.
+
+        :param with_total: 
+            Also count the full result set (costs an extra `COUNT(*)`).
+        """
+        self.cursor = cursor
+        self.per_page = per_page
+        self.total = query.order_by(None).count() if with_total else None
+
+        ordered = query.order_by(None).order_by(desc(model.created_at), desc(model.id))
+        if cursor:
+            created_at, last_id = self.decode(cursor)
+            ordered = ordered.filter(or_(
+                model.created_at < created_at,
+                and_(model.created_at == created_at, model.id < last_id)
+            ))
+
+        rows = ordered.limit(per_page + 1).all()
+        self.has_next = len(rows) > per_page
+        self.items = rows[:per_page]
+        self.next_cursor = self.encode(self.items[-1]) if self.has_next else None
+
+    @staticmethod
+    def encode(item):
+        """Build the cursor pointing just after `item`."""
+        raw = f"{item.created_at.isoformat()}|{item.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode(cursor):
+        """Return the `(created_at, id)` pair stored in `cursor`."""
+        try:
+            created_at, last_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return datetime.fromisoformat(created_at), int(last_id)
+        except Exception:
+            raise InvalidCursor(f"Invalid cursor <{cursor}>.")
+
+def paginate(query, model, page_size=5, page_size_arg='page_size', **kwargs):
+    """
+    Paginate `query` using the request's query string.
+
+    Uses keyset pagination (`CursorPagination`) when `?cursor=` is present (empty for the 
+    first page) and falls back to offset pagination with `?page=` otherwise. The total 
+    count is only computed in cursor mode when `?with_total=1` is requested.
+
+    :param query: 
+        The query to paginate.
+
+    :param model: 
+        The model being listed (used for the `(created_at, id)` keyset).
+
+    :param page_size: 
+        Default page size when none is requested.
+
+    :param page_size_arg: 
+        Name of the page size query parameter (`page_size` or `per_page`).
+
+    :param kwargs: 
+        Extra arguments for `.paginate()` in offset mode (e.g. `error_out=False`).
+    """
+    per_page = request.args.get(page_size_arg, page_size, type=int)
+
+    if 'cursor' in request.args:
+        with_total = request.args.get('with_total', '0').lower() in ('1', 'true', 'yes')
+        return CursorPagination(query, model, cursor=request.args.get('cursor') or None, per_page=per_page, with_total=with_total)
+
+    page = request.args.get('page', 1, type=int)
+    return query.paginate(page=page, per_page=per_page, **kwargs)
 
 class PageSerializer:
     def __init__(self, pagination_obj=None, items=None, resource_name=None, summary_func=None, context_id=None, **kwargs):
@@ -7,8 +100,8 @@ class PageSerializer:
         Initialize PageSerializer to handle paginated or non-paginated data.
 
         :param pagination_obj: 
-            QueryPagination object for paginated results. This is used when you want to serialize a 
-            set of results that are split across multiple pages.
+            QueryPagination (or CursorPagination) object for paginated results. This is used when 
+            you want to serialize a set of results that are split across multiple pages.
 
         :param items: 
             Non-paginated list of items to serialize. This is used when you want to serialize a 
@@ -21,6 +114,8 @@ class PageSerializer:
         :param summary_func: 
             Function to extract a summary from each resource (defaults to `.get_summary`). This 
             allows customization of how each item is represented in the serialized output.
+            When omitted and the model defines a batch `get_summaries(items, **kwargs)` (e.g. 
+            `Product`), the whole page is summarized in one go to avoid per-row queries.
 
         :param context_id: 
             Optional ID for URL construction (can be category_id, user_id, etc.). This ID is 
@@ -33,9 +128,12 @@ class PageSerializer:
         self.data = {}
         self.resource_name = resource_name or "items"  # Default name for resource
         self.summary_func = summary_func or (lambda item, **kw: item.get_summary(**kw))
+        self.use_batch = summary_func is None  # Only batch when the default summary is used
         self.context_id = context_id  # Store context_id for URL construction
         
-        if pagination_obj:
+        if isinstance(pagination_obj, CursorPagination):
+            self._serialize_cursor(pagination_obj, **kwargs)
+        elif pagination_obj:
             self._serialize_pagination(pagination_obj, **kwargs)
         elif items is not None:
             self._serialize_items(items, **kwargs)
@@ -55,7 +153,7 @@ class PageSerializer:
         if not isinstance(pagination_obj, QueryPagination):
             raise TypeError(f"Expected Pagination object of {QueryPagination}, got {type(pagination_obj)}")
         
-        self.items = [self.summary_func(resource, **kwargs) for resource in pagination_obj.items]
+        self.items = self._summarize(pagination_obj.items, **kwargs)
         self.data['total_items_count'] = pagination_obj.total
         self.data['offset'] = (pagination_obj.page - 1) * pagination_obj.per_page
         self.data['requested_page_size'] = pagination_obj.per_page
@@ -67,15 +165,36 @@ class PageSerializer:
         # Construct URLs dynamically, including context_id if provided
         base_url = request.path
         self.data['next_page_url'] = (
-            url_for(request.endpoint, page=pagination_obj.next_num, page_size=pagination_obj.per_page, context_id=self.context_id)
+            self._page_url(page=pagination_obj.next_num, page_size=pagination_obj.per_page)
             if pagination_obj.has_next else None
         )
         
         self.data['prev_page_url'] = (
-            url_for(request.endpoint, page=pagination_obj.prev_num, page_size=pagination_obj.per_page, context_id=self.context_id)
+            self._page_url(page=pagination_obj.prev_num, page_size=pagination_obj.per_page)
             if pagination_obj.has_prev else None
         )
 
+    def _serialize_cursor(self, cursor_obj, **kwargs):
+        """
+        Serialize keyset-paginated results into a structured format.
+
+        :param cursor_obj: 
+            The CursorPagination object containing the current page of items and the next cursor.
+        """
+        self.items = self._summarize(cursor_obj.items, **kwargs)
+        self.data['total_items_count'] = cursor_obj.total  # None unless `with_total` was requested
+        self.data['requested_page_size'] = cursor_obj.per_page
+        self.data['has_next_page'] = cursor_obj.has_next
+        self.data['has_prev_page'] = cursor_obj.cursor is not None
+        self.data['cursor'] = cursor_obj.cursor
+        self.data['next_cursor'] = cursor_obj.next_cursor
+
+        self.data['next_page_url'] = (
+            self._page_url(cursor=cursor_obj.next_cursor, page_size=cursor_obj.per_page)
+            if cursor_obj.has_next and request.endpoint else None
+        )
+        self.data['prev_page_url'] = None  # Keyset pages only move forward
+
     def _serialize_items(self, items, **kwargs):
         """
         Serialize non-paginated items into a structured format.
@@ -83,7 +202,7 @@ class PageSerializer:
         :param items: 
             A list of items to serialize.
         """
-        self.items = [self.summary_func(resource, **kwargs) for resource in items]
+        self.items = self._summarize(items, **kwargs)
         self.data['total_items_count'] = len(items)
         self.data['offset'] = 0
         self.data['requested_page_size'] = len(items)
@@ -94,6 +213,32 @@ class PageSerializer:
         self.data['next_page_url'] = None
         self.data['prev_page_url'] = None
 
+    def _page_url(self, **params):
+        """
+        Build the URL of another page of the current listing, keeping the route's arguments and 
+        the other query parameters (filters such as `include_descendants`, `with_total`).
+        """
+        values = {**(request.view_args or {}), **request.args.to_dict(), 'context_id': self.context_id}
+        values.pop('page', None)
+        values.pop('cursor', None)
+        values.update(params)
+        return url_for(request.endpoint, **values)
+
+    def _summarize(self, resources, **kwargs):
+        """
+        Summarize a page of resources, preferring the model's batch `get_summaries` when available.
+
+        :param resources: 
+            The resources (model instances) of the current page.
+        """
+        resources = list(resources)
+        batch_func = getattr(type(resources[0]), 'get_summaries', None) if resources else None
+
+        if self.use_batch and batch_func is not None:
+            return batch_func(resources, **kwargs)
+
+        return [self.summary_func(resource, **kwargs) for resource in resources]
+
     def get_data(self):
         """
         Return the serialized data in a structured format.
@@ -1,11 +1,16 @@
-from os import getenv, makedirs, path, listdir
+from concurrent.futures import ThreadPoolExecutor
+from os import getenv, makedirs, path, listdir, remove, replace, utime
+from uuid import uuid4
 import re, hashlib, cv2
 
 import numpy as np
+from PIL import Image
 from werkzeug.utils import secure_filename
 from flask import jsonify, current_app, request
 
 from web.apis.utils.serializers import error_response
+from web.apis.models.file_uploads import UploadedContent
+from web.apis.utils.images import image_extensions
 
 # Define a regular expression pattern for valid filenames (excluding illegal characters)
 valid_filename_pattern = re.compile(r'^[a-zA-Z0-9_.]+$')
@@ -145,9 +150,117 @@ def uploader_BAK2(file, upload_dir=None):
 
 # from dotenv import getenv
 
+video_extensions = ['.mp4', '.mov', '.webm', '.avi']
+
+_upload_executor = None
+
+def hashed_path(upload_folder, file_hash, extension):
+    """ Content-addressed location, e.g. `<upload_folder>/ab/cd/abcd...ef.png`. """
+    return path.join(upload_folder, file_hash[:2], file_hash[2:4], f"{file_hash}{extension}")
+
+# Leading bytes of each supported image format, checked before anything is decoded
+image_signatures = {
+    '.jpg': [b'\xff\xd8\xff'],
+    '.jpeg': [b'\xff\xd8\xff'],
+    '.png': [b'\x89PNG\r\n\x1a\n'],
+    '.gif': [b'GIF87a', b'GIF89a'],
+    '.bmp': [b'BM'],
+    '.webp': [b'RIFF'],
+}
+
+def ingest(file, upload_folder, chunk_size=None):
+    """ 
+    Stream an upload to a temporary file under `upload_folder`, hashing it on the way, so memory
+    stays bounded by `chunk_size` whatever the size of the file.
+
+    Returns:
+        tuple: (temp_path, sha256 hex digest, size in bytes, first bytes of the file)
+    """
+    chunk_size = chunk_size or current_app.config.get('UPLOAD_CHUNK_SIZE', 1024 * 1024)
+    incoming = path.join(upload_folder, '.incoming')
+    makedirs(incoming, exist_ok=True)
+
+    temp_path = path.join(incoming, f"{uuid4().hex}.part")
+    digest, size, header = hashlib.sha256(), 0, b''
+    try:
+        with open(temp_path, 'wb') as temp_file:
+            for chunk in iter(lambda: file.stream.read(chunk_size), b''):
+                if not header:
+                    header = chunk[:16]
+                digest.update(chunk)
+                temp_file.write(chunk)
+                size += len(chunk)
+    except Exception:
+        remove(temp_path)
+        raise
+
+    return temp_path, digest.hexdigest(), size, header
+
+def is_image_header(header, extension):
+    signatures = image_signatures.get(extension, [])
+    if extension == '.webp':
+        return header[:4] == b'RIFF' and header[8:12] == b'WEBP'
+    return any(header.startswith(signature) for signature in signatures)
+
+def store_upload(file, upload_dir=None):
+    """ 
+    Store one upload and return where it went. This is the body of `uploader()`, raising instead
+    of returning an error response.
+
+    Uploads are streamed to disk in chunks (see `ingest`), stored under a path derived from the
+    sha256 of their content and indexed in `UploadedContent`, so a duplicate upload is a single
+    indexed lookup. Files are stored as uploaded; images are checked (size and header) but not
+    decoded, their renditions are produced by `web.apis.utils.images.queue_renditions()`.
+
+    Returns:
+        tuple: (full path of the stored file, its size in bytes)
+    """
+    _, file_extension = path.splitext(file.filename)
+    file_extension = file_extension.lower()
+    if file_extension not in image_extensions + video_extensions + ['.svg']:
+        raise ValueError("Unsupported file format")
+
+    # Set default upload directory if not provided
+    upload_folder = upload_dir or path.join(current_app.root_path, f"{getenv('IMAGES_LOCATION')}/uploads")
+
+    temp_path, file_hash, file_size, header = ingest(file, upload_folder)
+    try:
+        # Same content uploaded before: reuse the stored file
+        existing_path = UploadedContent.lookup(file_hash)
+        if existing_path:
+            try:
+                # Refresh the mtime so the orphan collector's grace period restarts for the reused file
+                utime(existing_path)
+                return existing_path, file_size
+            except FileNotFoundError:
+                pass  # collected meanwhile, store it again
+
+        full_path = hashed_path(upload_folder, file_hash, file_extension)
+
+        # Images are only checked here, their renditions are rendered in the background
+        # by `queue_renditions()` once the upload is committed
+        if file_extension in image_extensions:
+            max_size = current_app.config.get('MAX_IMAGE_UPLOAD_SIZE', 10 * 1024 * 1024)
+            if file_size > max_size:
+                raise ValueError(f"Image is too large ({file_size} bytes, max {max_size})")
+            if not is_image_header(header, file_extension):
+                raise ValueError("Invalid image format")
+
+        # Move the streamed file into place
+        makedirs(path.dirname(full_path), exist_ok=True)
+        replace(temp_path, full_path)
+
+        UploadedContent.remember(file_hash, full_path, file_size)
+        return full_path, file_size
+
+    finally:
+        if path.exists(temp_path):
+            remove(temp_path)
+
 def uploader(file, upload_dir=None):
     """ 
     Uploads any kind of file/media/image/format ['.jpg', '.jpeg', '.png', '.webp', '.svg', '.gif', '.bmp'].
+    See `store_upload()`.
     
     Parameters:
         file: The file to upload.
@@ -158,56 +271,69 @@ def uploader(file, upload_dir=None):
     """
     try:
         if file and file.filename:
-            file_content = file.read()
-            file_hash = hashlib.md5(file_content).hexdigest()
-
-            # Set default upload directory if not provided
-            upload_folder = upload_dir or path.join(current_app.root_path, f"{getenv('IMAGES_LOCATION')}/uploads")
-            
-            if not path.exists(upload_folder):
-                makedirs(upload_folder, exist_ok=True)  # Ensure the directory exists
-
-            output_size = (200, 300)
-            existing_files = listdir(upload_folder)
-            
-            # Extract the original filename (without extension)
-            _, file_extension = path.splitext(file.filename)
-            cleaned_filename = secure_filename(file.filename.rsplit('.', 1)[0]).lower()  # Clean the filename
-            file_name = f"{cleaned_filename}{file_extension.lower()}"
-            full_path = path.join(upload_folder, file_name)
-
-            # Check for existing files
-            if file_name in existing_files:
-                return full_path  # Return the full path if the file already exists
-            
-            for existing_file in existing_files:
-                existing_file_path = path.join(upload_folder, existing_file)
-                if path.isfile(existing_file_path):
-                    with open(existing_file_path, 'rb') as ef:
-                        existing_file_content = ef.read()
-                        existing_file_hash = hashlib.md5(existing_file_content).hexdigest()
-                        if existing_file_hash == file_hash:
-                            return existing_file_path  # Return the full path of the existing file
-
-            # Handle different file types
-            if file_extension.lower() in ['.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp']:
-                img = cv2.imdecode(np.frombuffer(file_content, np.uint8), -1)
-                if img is None:
-                    raise ValueError("Invalid image format")
-                img = cv2.resize(img, output_size, interpolation=cv2.INTER_AREA)
-                cv2.imwrite(full_path, img)
-            elif file_extension.lower() in ['.mp4', '.mov', '.webm', '.avi']:
-                with open(full_path, 'wb') as video_file:
-                    video_file.write(file_content)
-            elif file_extension.lower() == '.svg':
-                with open(full_path, 'wb') as svg_file:
-                    svg_file.write(file_content)
-            else:
-                raise ValueError("Unsupported file format")
-
+            full_path, _ = store_upload(file, upload_dir)
             return full_path  # Return the full file path of the uploaded file
 
         return error_response('Please choose a file to upload')
     
     except (ValueError, Exception) as e:
         return error_response(f"Error processing the file: {str(e)}")
+
+def image_pixels(file):
+    """ Width x height of an uploaded image, read from its header without decoding it (0 if unreadable). """
+    try:
+        with Image.open(file.stream) as img:
+            width, height = img.size
+        return width * height
+    except Image.DecompressionBombError as e:
+        raise ValueError(f"{file.filename} is too large: {e}")
+    except Exception:
+        return 0
+    finally:
+        file.stream.seek(0)
+
+def upload_many(files, upload_dir=None):
+    """ 
+    Store several uploads concurrently on the shared `UPLOAD_WORKERS` thread pool.
+
+    Before any work starts, the pixel count of every image is read from its header and checked
+    against `MAX_IMAGE_PIXELS` (per image) and `MAX_REQUEST_PIXELS` (all images of the request),
+    so one request cannot tie up the pool or the rendition workers.
+
+    Returns:
+        list: (full path, size in bytes) per file, in the order of `files`.
+
+    Raises:
+        ValueError: if a file is rejected; the first error in `files` order is raised.
+    """
+    config = current_app.config
+    max_image_pixels = config.get('MAX_IMAGE_PIXELS', 40_000_000)
+    max_request_pixels = config.get('MAX_REQUEST_PIXELS', 100_000_000)
+
+    total_pixels = 0
+    for file in files:
+        if path.splitext(file.filename)[1].lower() in image_extensions:
+            pixels = image_pixels(file)
+            if pixels > max_image_pixels:
+                raise ValueError(f"{file.filename} is too large ({pixels} pixels, max {max_image_pixels})")
+            total_pixels += pixels
+
+    if total_pixels > max_request_pixels:
+        raise ValueError(f"Too many pixels in one request ({total_pixels}, max {max_request_pixels})")
+
+    app = current_app._get_current_object()
+
+    def store(file):
+        with app.app_context():
+            return store_upload(file, upload_dir)
+
+    return list(upload_executor(app).map(store, files))
+
+def upload_executor(app):
+    """ Thread pool shared by every request: hashing/writing releases the GIL, so threads are enough. """
+    global _upload_executor
+    if _upload_executor is None:
+        _upload_executor = ThreadPoolExecutor(
+            max_workers=app.config.get('UPLOAD_WORKERS', 4), thread_name_prefix='uploads'
+        )
+    return _upload_executor
@@ -0,0 +1,93 @@
+from functools import wraps
+from flask import request
+from jsonschema import ValidationError
+from jsonschema.validators import validator_for
+from web.apis.utils.serializers import error_response
+from web.apis.schemas import address, categories, chats, comment, order, pages, product, transactions, user
+
+class SchemaRegistry:
+    def __init__(self):
+        """
+        Compiled jsonschema validators, keyed by the identity of the schema dict they were built from.
+
+        `jsonschema.validate()` re-checks the schema against its metaschema and builds a new validator
+        on every call; here both happen once per schema, so a request only pays for `iter_errors()`.
+        """
+        self._validators = {}
+        self._names = {}
+
+    def register(self, name, schema):
+        """Check `schema` against its metaschema and compile a validator (with format checking) for it."""
+        if id(schema) in self._validators:
+            return self._validators[id(schema)]
+
+        cls = validator_for(schema)
+        cls.check_schema(schema)
+        self._validators[id(schema)] = cls(schema, format_checker=cls.FORMAT_CHECKER)
+        self._names[id(schema)] = name
+        return self._validators[id(schema)]
+
+    def register_module(self, module):
+        """Register every module-level schema dict, plus the per-event dicts such as `chat_event_schemas`."""
+        for name, value in vars(module).items():
+            if name.startswith('_') or not isinstance(value, dict):
+                continue
+            if name.endswith('_schemas'):
+                for event, schema in value.items():
+                    self.register(f"{name}.{event}", schema)
+            elif 'type' in value or 'properties' in value:
+                self.register(name, value)
+
+    def get(self, schema):
+        """Return the compiled validator for `schema`, compiling it on first use if it was not registered."""
+        validator = self._validators.get(id(schema))
+        if validator is None:
+            validator = self.register(f"<schema {id(schema)}>", schema)
+        return validator
+
+    def errors(self, instance, schema):
+        """
+        Validate `instance` and return every error message in one pass (an empty list when it is valid).
+        """
+        messages = []
+        for error in sorted(self.get(schema).iter_errors(instance), key=lambda e: [str(part) for part in e.absolute_path]):
+            path = '.'.join(str(part) for part in error.absolute_path)
+            messages.append(f"{path}: {error.message}" if path else error.message)
+        return messages
+
+    def names(self):
+        return sorted(self._names.values())
+
+schema_registry = SchemaRegistry()
+for module in (address, categories, chats, comment, order, pages, product, transactions, user):
+    schema_registry.register_module(module)
+
+def validate(instance, schema):
+    """
+    Drop-in replacement for `jsonschema.validate()` backed by the compiled validators.
+
+    :raises ValidationError: with every error message joined, so `e.message` reports them all at once.
+    """
+    messages = schema_registry.errors(instance, schema)
+    if messages:
+        raise ValidationError('; '.join(messages))
+
+def validate_json(schema, status_code=400):
+    """
+    Validate the JSON body of the request against `schema` before calling the view.
+
+    :return: an error response listing every validation error when the body is invalid.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(*args, **kwargs):
+            data = request.get_json(silent=True)
+            if data is None:
+                return error_response("Validation error: request body must be JSON.", status_code=status_code)
+
+            messages = schema_registry.errors(data, schema)
+            if messages:
+                return error_response(f"Validation error: {'; '.join(messages)}", status_code=status_code)
+            return view_func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -7,6 +7,13 @@ class Config:
     SECRET_KEY = getenv('SECRET_KEY')  # Provide a default for local testing
     RESET_PASS_TOKEN_MAX_AGE = 3600  # Token valid for 1 hour
 
+    # Password hashing (see web.apis.utils.passwords); hashes with another method are upgraded on sign-in
+    PASSWORD_HASH_METHOD = getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_SALT_LENGTH = int(getenv('PASSWORD_HASH_SALT_LENGTH', 16))
+    PASSWORD_HASH_WORKERS = int(getenv('PASSWORD_HASH_WORKERS', 2))  # Hashing processes per app process, 0 = inline
+    PASSWORD_HASH_MAX_PENDING = int(getenv('PASSWORD_HASH_MAX_PENDING', 16))  # Queued + running hashes before 503s
+    PASSWORD_HASH_TIMEOUT = int(getenv('PASSWORD_HASH_TIMEOUT', 10))
+
     # Flask JWT Extended
     JWT_SECRET_KEY = SECRET_KEY
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=10)  # Set expiration in days for clarity
@@ -14,6 +21,11 @@ class Config:
     JWT_AUTH_HEADER_PREFIX = 'Bearer'
     JWT_TOKEN_LOCATION = ['headers', 'cookies', 'query_string', 'json']
 
+    # Revoked JWTs (see web.apis.utils.revocation)
+    REVOCATION_BLOOM_CAPACITY = int(getenv('REVOCATION_BLOOM_CAPACITY', 100000))
+    REVOCATION_BLOOM_ERROR_RATE = float(getenv('REVOCATION_BLOOM_ERROR_RATE', 0.001))
+    REVOCATION_BLOOM_REBUILD_SECONDS = int(getenv('REVOCATION_BLOOM_REBUILD_SECONDS', 600))  # Sheds expired ids
+
     # Payment Configuration
     FLUTTERWAVE_SK = getenv('FLUTTERWAVE_SK')
     FLUTTERWAVE_TK = getenv('FLUTTERWAVE_TK')
@@ -31,6 +43,15 @@ class Config:
     SQLALCHEMY_POOL_SIZE = 50
     SQLALCHEMY_POOL_TIMEOUT = 30
     SQLALCHEMY_MAX_OVERFLOW = 20
+    QUERY_STATS = getenv('QUERY_STATS', str(DEBUG)) == 'True'  # Per-request query count/Server-Timing
+    QUERY_STATS_N_PLUS_ONE_THRESHOLD = int(getenv('QUERY_STATS_N_PLUS_ONE_THRESHOLD', 5))
+    SUMMARY_CACHE_TTL = int(getenv('SUMMARY_CACHE_TTL', 300))  # Seconds a cached product/page summary lives
+    AUTH_USER_CACHE_TTL = int(getenv('AUTH_USER_CACHE_TTL', 60))  # Seconds the user behind a JWT is cached
+    USER_IDENTIFIERS_FALLBACK = getenv('USER_IDENTIFIERS_FALLBACK', 'False') == 'True'  # Sign-in also searches `users` on a miss; only until backfill_user_identifiers.py has run
+
+    # JSON encoding: 'default' (Flask's stdlib provider) or, opt-in, 'msgspec' (faster, but ISO 8601
+    # datetimes instead of RFC 822 and unsorted keys, so clients must be ready for it)
+    JSON_PROVIDER = getenv('JSON_PROVIDER', 'default')
 
     # Mail Configuration
     MAIL_SERVER = getenv('MAIL_SERVER', 'localhost')
@@ -40,12 +61,39 @@ class Config:
     MAIL_PASSWORD = getenv('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = getenv('MAIL_DEFAULT_SENDER', 'Techa Support <support@techa.tech>')
     MAIL_DEBUG = 1
+    # Background mailer (see web.apis.utils.mailer)
+    MAIL_WORKERS = int(getenv('MAIL_WORKERS', 2))  # Worker threads, each holding one SMTP connection
+    MAIL_QUEUE_SIZE = int(getenv('MAIL_QUEUE_SIZE', 1000))  # Queued messages before new ones are dropped
+    MAIL_BATCH_SIZE = int(getenv('MAIL_BATCH_SIZE', 50))  # Messages sent per connection before reconnecting
+    MAIL_IDLE_TIMEOUT = float(getenv('MAIL_IDLE_TIMEOUT', 5))  # Seconds an idle connection is kept open
+    MAIL_MAX_RETRIES = int(getenv('MAIL_MAX_RETRIES', 3))
+    MAIL_RETRY_BACKOFF = float(getenv('MAIL_RETRY_BACKOFF', 2))
 
     # Payments
     STRIPE_SECRET_KEY = getenv('STRIPE_SECRET_KEY')
     PAYPAL_CLIENT_ID = getenv('PAYPAL_CLIENT_ID')
     PAYPAL_SECRET = getenv('PAYPAL_SECRET')
     PAYSTACK_SK = getenv('PAYSTACK_SK')
+    PAYSTACK_BASE_URL = getenv('PAYSTACK_BASE_URL', 'https://api.paystack.co')
+    FLUTTERWAVE_BASE_URL = getenv('FLUTTERWAVE_BASE_URL', 'https://api.flutterwave.com')
+    FLUTTERWAVE_WEBHOOK_HASH = getenv('FLUTTERWAVE_WEBHOOK_HASH')  # 'Secret hash' set on the Flutterwave dashboard
+
+    # Webhook inbox (see process_webhooks.py)
+    WEBHOOK_BATCH_SIZE = int(getenv('WEBHOOK_BATCH_SIZE', 100))
+    WEBHOOK_MAX_ATTEMPTS = int(getenv('WEBHOOK_MAX_ATTEMPTS', 5))
+    WEBHOOK_RETRY_BACKOFF = int(getenv('WEBHOOK_RETRY_BACKOFF', 30))  # Seconds before the first retry of an event, doubled on each attempt
+
+    # Reconciliation of pending transactions (see reconcile_transactions.py)
+    RECONCILE_CONCURRENCY = int(getenv('RECONCILE_CONCURRENCY', 8))  # Verify calls in flight per provider
+    RECONCILE_MIN_AGE_MINUTES = int(getenv('RECONCILE_MIN_AGE_MINUTES', 30))
+
+    # Gateway HTTP clients (see web.apis.utils.gateways)
+    GATEWAY_CONNECT_TIMEOUT = float(getenv('GATEWAY_CONNECT_TIMEOUT', 3.05))
+    GATEWAY_READ_TIMEOUT = float(getenv('GATEWAY_READ_TIMEOUT', 20))
+    GATEWAY_RETRIES = int(getenv('GATEWAY_RETRIES', 2))
+    GATEWAY_POOL_SIZE = int(getenv('GATEWAY_POOL_SIZE', 20))
+    GATEWAY_FAILURE_THRESHOLD = int(getenv('GATEWAY_FAILURE_THRESHOLD', 5))  # Consecutive failures that open the circuit
+    GATEWAY_RESET_TIMEOUT = int(getenv('GATEWAY_RESET_TIMEOUT', 30))  # Seconds before a trial call is let through
 
     # Miscellaneous
     LOG_TO_STDOUT = getenv('LOG_TO_STDOUT')
@@ -59,6 +107,25 @@ class Config:
     UPLOAD_FOLDER = getenv('UPLOAD_FOLDER', './uploads')
     MAX_CONTENT_PATH = int(getenv('MAX_CONTENT_PATH', 1024 * 1024))  # Default to 1MB
     ALLOWED_EXTENSIONS = getenv('ALLOWED_EXTENSIONS', 'jpg,jpeg,png,gif,mov,mp4').split(',')
+    UPLOAD_CHUNK_SIZE = int(getenv('UPLOAD_CHUNK_SIZE', 1024 * 1024))  # Bytes read per chunk when streaming uploads
+    IMAGE_PIPELINE_WORKERS = int(getenv('IMAGE_PIPELINE_WORKERS', 2))  # Processes rendering image renditions, 0 renders inline
+    UPLOAD_WORKERS = int(getenv('UPLOAD_WORKERS', 4))  # Threads storing the images of a request concurrently
+    MAX_IMAGE_PIXELS = int(getenv('MAX_IMAGE_PIXELS', 40_000_000))  # Per image, read from the header before storing
+    MAX_REQUEST_PIXELS = int(getenv('MAX_REQUEST_PIXELS', 100_000_000))  # All images of one request
+    PHASH_MAX_DISTANCE = min(3, int(getenv('PHASH_MAX_DISTANCE', 3)))  # Bits two image hashes may differ by to be near-duplicates; can only be lowered, 3 is the most the four-band lookup finds
+    PHASH_REUSE_DUPLICATES = getenv('PHASH_REUSE_DUPLICATES', 'False') == 'True'  # Point near-duplicates at the original's files
+    MAX_IMAGE_UPLOAD_SIZE = int(getenv('MAX_IMAGE_UPLOAD_SIZE', 10 * 1024 * 1024))  # Images above this are rejected before decoding
+
+    # On-demand resized media (/media/<hash>?w=&h=&fmt=)
+    MEDIA_CACHE_DIR = getenv('MEDIA_CACHE_DIR', path.join(path.abspath(path.dirname(__file__)), 'media_cache'))
+    MEDIA_CACHE_MAX_BYTES = int(getenv('MEDIA_CACHE_MAX_BYTES', 1024 * 1024 * 1024))  # LRU-evicted past this
+    MEDIA_MAX_DIMENSION = int(getenv('MEDIA_MAX_DIMENSION', 2000))
+    MEDIA_ROOT = getenv('MEDIA_ROOT', IMAGES_LOCATION)  # /media/files/<path> is served from here
+    MEDIA_MAX_AGE = int(getenv('MEDIA_MAX_AGE', 86400))  # Cache-Control max-age of files that are not content-addressed
+    MEDIA_SENDFILE = getenv('MEDIA_SENDFILE')  # None (stream from Python), 'x-sendfile' or 'x-accel-redirect'
+    MEDIA_ACCEL_PREFIX = getenv('MEDIA_ACCEL_PREFIX', '/protected-media/')  # nginx internal location mapped to MEDIA_ROOT
+    MEDIA_CACHE_ACCEL_PREFIX = getenv('MEDIA_CACHE_ACCEL_PREFIX', '/protected-media-cache/')  # ... and to MEDIA_CACHE_DIR
+    USE_X_SENDFILE = MEDIA_SENDFILE == 'x-sendfile'
 
     # Session Configuration
     SESSION_COOKIE_HTTPONLY = True
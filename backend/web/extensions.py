@@ -69,7 +69,9 @@ socketio = SocketIO(manage_session=False, cors_allowed_origins="*")
 
 def init_ext(app):
     """Initialize all extensions."""
+    from web.apis.utils.query_stats import init_query_stats
     db.init_app(app)
+    init_query_stats(app)
     # f_session.init_app(app)
     # redis.init_app(app)
     bcrypt.init_app(app)
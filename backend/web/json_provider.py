@@ -0,0 +1,69 @@
+import json
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+def _enc_hook(obj):
+    """Types msgspec does not encode natively; datetime, date, Decimal, UUID, sets and dataclasses are native."""
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class MsgspecJSONProvider(JSONProvider):
+    """
+    JSON provider backed by `msgspec.json`.
+
+    Unlike Flask's default provider, datetimes are encoded natively in C as ISO 8601 strings
+    (e.g. `2024-05-01T10:30:00`) instead of RFC 822 dates through the `default=` fallback, Decimals
+    are encoded as strings and keys keep their insertion order.
+    """
+    mimetype = 'application/json'
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._encoder = msgspec.json.Encoder(enc_hook=_enc_hook, decimal_format='string')
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Options such as `indent` or `default` are stdlib only
+            kwargs.setdefault('default', self._to_builtins)
+            return json.dumps(obj, **kwargs)
+        return self._encoder.encode(obj).decode('utf-8')
+
+    @staticmethod
+    def _to_builtins(obj):
+        return msgspec.to_builtins(obj, enc_hook=_enc_hook)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return self._decoder.decode(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encoder.encode(obj), mimetype=self.mimetype)
+
+json_providers = {
+    'default': DefaultJSONProvider,
+    'msgspec': MsgspecJSONProvider,
+}
+
+def init_json_provider(app):
+    """
+    Install the JSON provider named by the `JSON_PROVIDER` config ('msgspec' or 'default').
+
+    Falls back to Flask's default provider when msgspec is not installed.
+    """
+    name = app.config.get('JSON_PROVIDER', 'default')
+    if name not in json_providers:
+        raise ValueError(f"Unknown JSON_PROVIDER {name!r}, expected one of {', '.join(json_providers)}.")
+
+    if name == 'msgspec' and msgspec is None:
+        name = 'default'
+
+    app.json = json_providers[name](app)
+    return app.json
@@ -0,0 +1,175 @@
+import mimetypes
+import re
+import traceback
+from os import path
+import cv2
+from flask import abort, current_app, request, send_file
+from werkzeug.security import safe_join
+from web.apis.models.file_uploads import UploadedContent
+from web.apis.utils.images import encodable_extensions, fit, write_atomic
+from web.apis.utils.media_cache import DiskLRUCache, single_flight
+from web.apis.utils.serializers import error_response
+from web.media import media_bp
+
+formats = {'jpg': '.jpg', 'jpeg': '.jpg', 'png': '.png', 'webp': '.webp'}
+
+# Files stored by `uploader()` are named after the sha256 of their content
+content_addressed = re.compile(r'^([0-9a-f]{64})(?:_[\w]+)?\.\w+$')
+
+_variants = None
+
+def variants():
+    """ The on-disk cache of resized variants, built from config on first use. """
+    global _variants
+    if _variants is None:
+        _variants = DiskLRUCache(
+            current_app.config['MEDIA_CACHE_DIR'],
+            current_app.config.get('MEDIA_CACHE_MAX_BYTES', 1024 * 1024 * 1024)
+        )
+    return _variants
+
+def dimension(name):
+    """ Read a `w`/`h` query arg, capped at `MEDIA_MAX_DIMENSION`. """
+    value = request.args.get(name, type=int)
+    if value is None:
+        return None
+    if value <= 0:
+        raise ValueError(f"{name} must be a positive integer")
+    return min(value, current_app.config.get('MEDIA_MAX_DIMENSION', 2000))
+
+@media_bp.route('/media/<string:content_hash>', methods=['GET'])
+def media(content_hash):
+    """
+    Serve an uploaded file by its sha256, resized on demand.
+
+    `?w=&h=` fit the image in that box (keeping its aspect ratio, never upscaling) and `?fmt=`
+    re-encodes it (jpeg, png, webp). Variants are rendered once, from the original, into an
+    LRU disk cache; concurrent requests for the same variant wait for a single render.
+
+    :return: the file, or a JSON error.
+    """
+    try:
+        original = UploadedContent.lookup(content_hash.lower())
+        if not original:
+            return error_response("Media not found.", status_code=404)
+
+        width, height = dimension('w'), dimension('h')
+        fmt = request.args.get('fmt', '').lower()
+        if fmt and fmt not in formats:
+            return error_response(f"Unsupported format {fmt}, expected one of {', '.join(formats)}.", status_code=400)
+
+        if not (width or height or fmt):
+            return serve_file(original, etag=content_hash.lower(), immutable=True)
+
+        extension = path.splitext(original)[1].lower()
+        if extension not in encodable_extensions + ['.gif']:
+            return error_response("Only images can be resized.", status_code=400)
+
+        extension = formats.get(fmt) or (extension if extension in encodable_extensions else '.png')
+        key = f"{content_hash.lower()}_{width or 0}x{height or 0}{extension}"
+
+        cache = variants()
+        cached = cache.get(key)
+        if not cached:
+            with single_flight(key):
+                # Another worker may have rendered it while we waited
+                cached = cache.get(key)
+                if not cached:
+                    cached = render_variant(original, cache.path(key), width, height, extension)
+                    cache.added(cached)
+
+        return serve_file(cached, etag=key, immutable=True)
+
+    except ValueError as e:
+        return error_response(str(e), status_code=400)
+    except Exception as e:
+        traceback.print_exc()
+        return error_response(f"An error occurred: {str(e)}", status_code=500)
+
+def render_variant(original, target, width, height, extension):
+    img = cv2.imread(original, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise ValueError("Invalid image format")
+
+    h, w = img.shape[:2]
+    img = fit(img, width or w, height or h)
+    if extension == '.jpg' and img.ndim == 3 and img.shape[2] == 4:
+        img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)  # JPEG has no alpha channel
+
+    ok, encoded = cv2.imencode(extension, img)
+    if not ok:
+        raise ValueError("Could not encode the image")
+
+    write_atomic(target, encoded.tobytes())
+    return target
+
+@media_bp.route('/media/files/<path:filename>', methods=['GET'])
+def media_file(filename):
+    """
+    Serve a stored upload by its path under `MEDIA_ROOT`, i.e. a `FileUpload.file_path` relative to it.
+
+    Content-addressed files get their hash as a strong ETag and are cached for a year; other files
+    get an ETag from their mtime/size and `MEDIA_MAX_AGE`.
+    """
+    file_path = safe_join(current_app.config['MEDIA_ROOT'], filename)
+    if file_path is None or not path.isfile(file_path):
+        abort(404)
+
+    if content_addressed.match(path.basename(file_path)):
+        return serve_file(file_path, etag=path.basename(file_path), immutable=True)
+    return serve_file(file_path)
+
+def serve_file(file_path, etag=True, immutable=False):
+    """
+    Send `file_path` with validators and caching headers. `If-None-Match` gets a 304 and `Range`
+    a 206 (e.g. for video seeking).
+
+    With `MEDIA_SENDFILE = 'x-accel-redirect'` only headers are sent and nginx streams the file
+    from an internal location (see `internal_location`), handling ranges itself. With
+    `'x-sendfile'` Flask's `USE_X_SENDFILE` hands the file to Apache/lighttpd.
+
+    :param etag: a strong ETag value for immutable content, or True to derive one from mtime/size.
+    :param immutable: the content can never change at this URL (content-addressed).
+    """
+    config = current_app.config
+    max_age = 31536000 if immutable else config.get('MEDIA_MAX_AGE', 86400)
+    file_path = path.abspath(file_path)
+
+    accel_path = internal_location(file_path) if config.get('MEDIA_SENDFILE') == 'x-accel-redirect' else None
+
+    if accel_path:
+        response = current_app.response_class(mimetype=mimetypes.guess_type(file_path)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = accel_path
+        if isinstance(etag, str):
+            response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response = response.make_conditional(request)
+    else:
+        response = send_file(file_path, conditional=True, etag=etag, max_age=max_age)
+
+    if immutable:
+        response.cache_control.immutable = True
+    return response
+
+def internal_location(file_path):
+    """
+    The nginx internal URI of `file_path`: `MEDIA_ACCEL_PREFIX` maps to `MEDIA_ROOT` and
+    `MEDIA_CACHE_ACCEL_PREFIX` to `MEDIA_CACHE_DIR`. None if the file is under neither.
+    """
+    config = current_app.config
+    locations = [
+        (config.get('MEDIA_ROOT'), config.get('MEDIA_ACCEL_PREFIX')),
+        (config.get('MEDIA_CACHE_DIR'), config.get('MEDIA_CACHE_ACCEL_PREFIX')),
+    ]
+    for root, prefix in locations:
+        if not (root and prefix):
+            continue
+        root = path.abspath(root)
+        try:
+            if path.commonpath([root, file_path]) != root:
+                continue
+        except ValueError:  # Different drives on Windows
+            continue
+        return f"{prefix.rstrip('/')}/{path.relpath(file_path, root).replace(path.sep, '/')}"
+    return None